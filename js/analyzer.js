@@ -0,0 +1,100 @@
+// js/analyzer.js
+
+// Page-side client for js/correlation-worker.js. Only one symptom analysis
+// runs at a time: starting a new one cancels the previous. Matrix builds
+// run alongside it. Where workers are unavailable (e.g. pages opened from
+// file://) the same sliced sweep runs in-thread.
+
+window.CorrelationAnalyzer = class CorrelationAnalyzer {
+    constructor(workerUrl = 'js/correlation-worker.js') {
+        this.workerUrl = workerUrl;
+        this.worker = undefined;
+        this.nextJobId = 1;
+        this.jobs = new Map();
+        this.job = null;
+    }
+
+    getWorker() {
+        if (this.worker === undefined) {
+            try {
+                this.worker = new Worker(this.workerUrl);
+                this.worker.onmessage = (e) => this.handleMessage(e.data);
+                this.worker.onerror = (e) => {
+                    console.error('Analysis worker failed, analyzing in-thread instead:', e.message);
+                    e.preventDefault();
+                    this.worker.terminate();
+                    this.worker = null;
+                    this.jobs.forEach(job => this.runInThread(job));
+                };
+            } catch (error) {
+                console.warn('Analysis worker unavailable, analyzing in-thread:', error.message);
+                this.worker = null;
+            }
+        }
+        return this.worker;
+    }
+
+    // Resolves with the ranked rows, or null if a newer analysis cancelled this one
+    analyze(snapshot, { onProgress } = {}) {
+        this.cancel();
+        this.job = this.start(snapshot, onProgress);
+        return this.job.promise;
+    }
+
+    // Resolves with symptom -> trigger id -> count for a getMatrixSnapshot() input
+    buildMatrix(snapshot) {
+        return this.start(snapshot).promise;
+    }
+
+    cancel() {
+        const job = this.job;
+        if (!job) return;
+
+        this.job = null;
+        job.cancelled = true;
+        this.jobs.delete(job.id);
+        if (this.worker) this.worker.postMessage({ type: 'cancel', jobId: job.id });
+        job.resolve(null);
+    }
+
+    start(snapshot, onProgress) {
+        const job = { id: this.nextJobId++, snapshot, onProgress, cancelled: false };
+        job.promise = new Promise(resolve => (job.resolve = resolve));
+        this.jobs.set(job.id, job);
+
+        const worker = (typeof Worker !== 'undefined') ? this.getWorker() : null;
+        if (worker) {
+            worker.postMessage({ type: 'run', jobId: job.id, snapshot });
+        } else {
+            this.runInThread(job);
+        }
+        return job;
+    }
+
+    runInThread(job) {
+        window.CorrelationEngine.run(job.snapshot, {
+            isCancelled: () => job.cancelled,
+            onProgress: job.onProgress
+        }).then(result => {
+            if (result) this.finish(job, result);
+        });
+    }
+
+    handleMessage({ type, jobId, result, rows, done, total }) {
+        const job = this.jobs.get(jobId);
+        if (!job) return; // stale message from a cancelled job
+
+        if (type === 'progress') {
+            if (job.onProgress) job.onProgress({ done, total, rows });
+        } else if (type === 'result') {
+            this.finish(job, result);
+        }
+    }
+
+    finish(job, result) {
+        if (job.cancelled) return;
+        this.jobs.delete(job.id);
+        if (this.job === job) this.job = null;
+        job.resolve(result);
+    }
+};
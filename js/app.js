@@ -3,16 +3,30 @@
 
 class App {
     constructor() {
-        this.store = new window.Store();
+        // Store and render timings, shown by the ?debug panel
+        this.metrics = new window.Metrics();
+        this.store = new window.Store({ sync: new window.TabSync('vitaltrack'), lazy: true, metrics: this.metrics });
+        this.analyzer = new window.CorrelationAnalyzer();
         this.currentView = 'dashboard';
+        this.trendsRange = 7;
+        // One chart for the app's lifetime; its canvas is moved into each Trends render
+        this.chart = null;
+        this.chartWrapper = null;
         this.modal = document.getElementById('modal-container');
+        this.metricsPanel = null;
         this.init();
     }
 
     init() {
         this.setupNavigation();
         this.setupActionButtons();
-        this.render();
+        this.store.onChange(change => this.applyChange(change));
+        // The dashboard renders from the recent partition; once the rest of
+        // the history is in, the store emits { kind: 'all' }
+        this.store.recent.then(() => {
+            this.render();
+            if (this.store.hydrated) this.refreshCorrelationMatrix();
+        });
 
         // Global click handler to close modal
         this.modal.addEventListener('click', (e) => {
@@ -21,9 +35,38 @@ class App {
             }
         });
 
+        if (new URLSearchParams(location.search).has('debug')) this.toggleMetricsPanel();
+
         console.log('💚 VitalTrack Initialized');
     }
 
+    // Fixed panel with p50/p95 timings and counters, refreshed every second
+    toggleMetricsPanel() {
+        if (this.metricsPanel) {
+            clearInterval(this.metricsPanel.timer);
+            this.metricsPanel.remove();
+            this.metricsPanel = null;
+            return;
+        }
+        const panel = document.createElement('aside');
+        panel.id = 'metrics-panel';
+        panel.style.cssText = 'position: fixed; right: 1rem; bottom: 1rem; z-index: 1000; max-height: 60vh; overflow: auto; padding: 0.75rem 1rem; font: 12px/1.5 monospace; color: #e2e8f0; background: rgba(15, 23, 42, 0.95); border: 1px solid rgba(255, 255, 255, 0.1); border-radius: 8px;';
+        const update = () => {
+            const { timings, counters } = this.metrics.summary();
+            panel.innerHTML = `
+                <table>
+                    <tr><th align="left">timing (ms)</th><th>n</th><th>p50</th><th>p95</th><th>max</th></tr>
+                    ${Object.entries(timings).map(([name, t]) => `<tr><td>${name}</td><td align="right">${t.count}</td><td align="right">${t.p50}</td><td align="right">${t.p95}</td><td align="right">${t.max}</td></tr>`).join('')}
+                    ${Object.entries(counters).map(([name, value]) => `<tr><td>${name}</td><td colspan="4" align="right">${value}</td></tr>`).join('')}
+                </table>
+            `;
+        };
+        update();
+        panel.timer = setInterval(update, 1000);
+        document.body.appendChild(panel);
+        this.metricsPanel = panel;
+    }
+
     setupNavigation() {
         const navItems = document.querySelectorAll('.nav-item');
         navItems.forEach(item => {
@@ -45,7 +88,7 @@ class App {
         this.modal.innerHTML = '';
         let form;
         if (type === 'meal') {
-            form = window.Forms.MealForm((data) => this.handleSave(data));
+            form = window.Forms.MealForm((data) => this.handleSave(data), (prefix) => this.store.suggestIngredients(prefix));
         } else {
             form = window.Forms.SymptomForm((data) => this.handleSave(data));
         }
@@ -57,14 +100,121 @@ class App {
         this.modal.classList.add('hidden');
     }
 
+    // The entry shows at once; it is written in the background and the
+    // user is told if that fails
     handleSave(data) {
-        if (data.type === 'meal') {
-            this.store.addMeal(data);
+        const saved = data.type === 'meal' ? this.store.addMeal(data) : this.store.addSymptom(data);
+        saved.catch(error => {
+            console.error('Failed to save entry:', error);
+            alert('Your entry could not be saved to this device and will be lost when the page closes. Check your free storage space and try again.');
+        });
+        this.closeModal();
+    }
+
+    // Patches the current view for one new record instead of re-rendering it
+    applyChange(change) {
+        if (change.kind === 'all') {
+            // The data view shows no records, and re-rendering it would drop an import's progress
+            if (this.currentView !== 'data') this.render();
+            this.refreshCorrelationMatrix();
+            return;
+        }
+
+        this.metrics.time('render.patch', () => {
+            switch (this.currentView) {
+                case 'dashboard':
+                    this.patchDashboard();
+                    break;
+                case 'logs':
+                    if (change.kind === 'meals') this.patchLog();
+                    break;
+                case 'symptoms':
+                    if (change.kind === 'symptoms') this.patchLog();
+                    break;
+                case 'trends':
+                    this.patchTrends(change);
+                    break;
+            }
+        });
+    }
+
+    patchDashboard() {
+        const list = document.getElementById('recent-activity');
+        if (!list) {
+            // First record replaces the empty state
+            this.render();
+            return;
+        }
+
+        const stats = this.store.getStats();
+        document.querySelector('[data-stat="mealsToday"]').textContent = stats.mealsToday;
+        document.querySelector('[data-stat="symptomsToday"]').textContent = stats.symptomsToday;
+        this.patchKeyedList(list, this.store.getRecent(5), item => this.activityKey(item), item => this.renderActivityItem(item));
+    }
+
+    patchLog() {
+        if (this.virtualList) {
+            this.virtualList.refresh(this.logQuery.count());
         } else {
-            this.store.addSymptom(data);
+            this.render();
         }
-        this.closeModal();
-        this.render();
+    }
+
+    patchTrends(change) {
+        this.updateTrendsChart();
+
+        const select = document.getElementById('symptom-analyzer-select');
+        if (!select) return;
+
+        const name = change.record.symptom;
+        if (change.kind === 'symptoms' && ![...select.options].some(o => o.value === name)) {
+            select.add(new Option(name.charAt(0).toUpperCase() + name.slice(1), name));
+        }
+        this.renderTopTriggers();
+        if (select.value) this.handleSymptomAnalysis(select.value);
+    }
+
+    // Reorders, inserts and removes children by data-key so unchanged
+    // items keep their DOM nodes
+    patchKeyedList(parent, items, keyOf, render) {
+        const existing = new Map([...parent.children].map(el => [el.dataset.key, el]));
+        let cursor = parent.firstElementChild;
+
+        items.forEach(item => {
+            const key = String(keyOf(item));
+            let el = existing.get(key);
+            if (el) {
+                existing.delete(key);
+            } else {
+                const template = document.createElement('template');
+                template.innerHTML = render(item).trim();
+                el = template.content.firstElementChild;
+            }
+
+            if (el === cursor) {
+                cursor = cursor.nextElementSibling;
+            } else {
+                parent.insertBefore(el, cursor);
+            }
+        });
+
+        existing.forEach(el => el.remove());
+    }
+
+    // Builds the symptom x trigger matrix off the UI thread; the store keeps
+    // it current afterwards. Retries if records were added mid-build.
+    refreshCorrelationMatrix() {
+        if (this.store.matrix) return;
+
+        const snapshot = this.store.getMatrixSnapshot();
+        this.analyzer.buildMatrix(snapshot).then(matrix => {
+            if (!matrix) return;
+            if (!this.store.installMatrix(matrix, snapshot.revision)) {
+                this.refreshCorrelationMatrix();
+                return;
+            }
+            this.renderTopTriggers();
+        });
     }
 
     render() {
@@ -73,6 +223,21 @@ class App {
 
         title.innerText = this.currentView.charAt(0).toUpperCase() + this.currentView.slice(1);
 
+        if (this.virtualList) {
+            this.virtualList.destroy();
+            this.virtualList = null;
+        }
+
+        if (!this.store.hydrated && App.HISTORY_VIEWS.includes(this.currentView)) {
+            mainView.innerHTML = '<p class="muted">Loading history...</p>';
+            this.store.hydrate();
+            return;
+        }
+
+        this.metrics.time(`render.${this.currentView}`, () => this.renderView(mainView));
+    }
+
+    renderView(mainView) {
         switch (this.currentView) {
             case 'dashboard':
                 this.renderDashboard(mainView);
@@ -105,24 +270,15 @@ class App {
                 <div class="card summary-card">
                     <h3>Today's Highlights</h3>
                     <div class="stats">
-                        <div class="stat"><span>Meals Logged:</span> <strong>${stats.mealsToday}</strong></div>
-                        <div class="stat"><span>Symptoms:</span> <strong>${stats.symptomsToday}</strong></div>
+                        <div class="stat"><span>Meals Logged:</span> <strong data-stat="mealsToday">${stats.mealsToday}</strong></div>
+                        <div class="stat"><span>Symptoms:</span> <strong data-stat="symptomsToday">${stats.symptomsToday}</strong></div>
                     </div>
                 </div>
                 <div class="card recent-logs">
                     <h3>Recent Activity</h3>
                     ${recent.length === 0 ? '<p class="muted">No activity tracked today yet.</p>' : `
-                        <ul class="activity-list">
-                            ${recent.map(item => `
-                                <li class="activity-item">
-                                    <span class="icon">${item.type === 'meal' ? '🍱' : '🤒'}</span>
-                                    <div class="details">
-                                        <strong>${item.name || item.symptom}</strong>
-                                        <small>${new Date(item.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}</small>
-                                    </div>
-                                    ${item.severity ? `<span class="severity-badge sev-${item.severity}">${item.severity}</span>` : ''}
-                                </li>
-                            `).join('')}
+                        <ul class="activity-list" id="recent-activity">
+                            ${recent.map(item => this.renderActivityItem(item)).join('')}
                         </ul>
                     `}
                 </div>
@@ -130,62 +286,128 @@ class App {
         `;
     }
 
+    activityKey(item) {
+        return `${item.type}:${item.id}`;
+    }
+
+    renderActivityItem(item) {
+        return `
+            <li class="activity-item" data-key="${this.activityKey(item)}">
+                <span class="icon">${item.type === 'meal' ? '🍱' : '🤒'}</span>
+                <div class="details">
+                    <strong>${item.name || item.symptom}</strong>
+                    <small>${new Date(item.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}</small>
+                </div>
+                ${item.severity ? `<span class="severity-badge sev-${item.severity}">${item.severity}</span>` : ''}
+            </li>
+        `;
+    }
+
     renderLogs(container) {
-        const meals = this.store.data.meals.slice().reverse();
+        // Newest first; rows are read from the index as they scroll into view
+        const meals = this.logQuery = this.store.query({ type: 'meals', order: 'desc' });
+        const count = meals.count();
         container.innerHTML = `
             <div class="logs-view">
-                ${meals.length === 0 ? '<p class="muted">No meals logged yet.</p>' : `
-                    <div class="activity-list">
-                        ${meals.map(meal => `
-                            <div class="card" style="margin-bottom: 1rem; display: flex; align-items: center; gap: 1rem;">
-                                <span style="font-size: 1.5rem;">🍱</span>
-                                <div>
-                                    <strong>${meal.name}</strong>
-                                    <p class="muted" style="font-size: 0.85rem;">${meal.ingredients || 'No ingredients listed'}</p>
-                                    <small>${new Date(meal.timestamp).toLocaleString()}</small>
-                                </div>
-                            </div>
-                        `).join('')}
-                    </div>
-                `}
+                ${count === 0 ? '<p class="muted">No meals logged yet.</p>' : '<div class="activity-list"></div>'}
             </div>
         `;
+        if (count === 0) return;
+
+        this.virtualList = new window.VirtualList({
+            container: container.querySelector('.activity-list'),
+            count,
+            getKey: (index) => meals.at(index).id,
+            renderRow: (index) => {
+                const meal = meals.at(index);
+                return `
+                    <div class="card log-row" style="margin-bottom: 1rem; display: flex; align-items: center; gap: 1rem;">
+                        <span style="font-size: 1.5rem;">🍱</span>
+                        <div style="min-width: 0;">
+                            <strong>${meal.name}</strong>
+                            <p class="muted" style="font-size: 0.85rem;">${meal.ingredients || 'No ingredients listed'}</p>
+                            <small>${new Date(meal.timestamp).toLocaleString()}</small>
+                        </div>
+                    </div>
+                `;
+            }
+        });
     }
 
     renderSymptoms(container) {
-        const symptoms = this.store.data.symptoms.slice().reverse();
+        const symptoms = this.logQuery = this.store.query({ type: 'symptoms', order: 'desc' });
+        const count = symptoms.count();
         container.innerHTML = `
             <div class="logs-view">
-                ${symptoms.length === 0 ? '<p class="muted">No symptoms logged yet.</p>' : `
-                    <div class="activity-list">
-                        ${symptoms.map(s => `
-                            <div class="card" style="margin-bottom: 1rem; display: flex; justify-content: space-between; align-items: center;">
-                                <div style="display: flex; align-items: center; gap: 1rem;">
-                                    <span style="font-size: 1.5rem;">🤒</span>
-                                    <div>
-                                        <strong style="text-transform: capitalize;">${s.symptom}</strong><br>
-                                        <small>${new Date(s.timestamp).toLocaleString()}</small>
-                                    </div>
-                                </div>
-                                <span class="severity-badge sev-${s.severity}">${s.severity}</span>
-                            </div>
-                        `).join('')}
-                    </div>
-                `}
+                ${count === 0 ? '<p class="muted">No symptoms logged yet.</p>' : '<div class="activity-list"></div>'}
             </div>
         `;
+        if (count === 0) return;
+
+        this.virtualList = new window.VirtualList({
+            container: container.querySelector('.activity-list'),
+            count,
+            getKey: (index) => symptoms.at(index).id,
+            renderRow: (index) => {
+                const s = symptoms.at(index);
+                return `
+                    <div class="card log-row" style="margin-bottom: 1rem; display: flex; justify-content: space-between; align-items: center;">
+                        <div style="display: flex; align-items: center; gap: 1rem;">
+                            <span style="font-size: 1.5rem;">🤒</span>
+                            <div>
+                                <strong style="text-transform: capitalize;">${s.symptom}</strong><br>
+                                <small>${new Date(s.timestamp).toLocaleString()}</small>
+                            </div>
+                        </div>
+                        <span class="severity-badge sev-${s.severity}">${s.severity}</span>
+                    </div>
+                `;
+            }
+        });
+    }
+
+    // Trend data for the current range, merged down to what the chart width can show
+    chartData() {
+        const width = this.chartWrapper.clientWidth || 720;
+        return window.DailyRollups.downsample(this.store.getTrendsData(this.trendsRange), Math.floor(width / App.MIN_BAR_WIDTH));
+    }
+
+    updateTrendsChart() {
+        if (!this.chart) return;
+        const trendData = this.chartData();
+        this.chart.data.labels = trendData.labels;
+        this.chart.data.datasets = trendData.datasets;
+        this.chart.options.animation = this.chartAnimation(trendData);
+        this.metrics.time('chart.update', () => this.chart.update());
+    }
+
+    chartAnimation(trendData) {
+        const points = trendData.labels.length * trendData.datasets.length;
+        return points > App.ANIMATED_POINTS ? false : { duration: 300 };
+    }
+
+    trendsTitle() {
+        return this.trendsRange === 'all' ? 'Symptom Frequency (All Time)' : `Symptom Frequency (Last ${this.trendsRange} Days)`;
     }
 
     renderTrends(container) {
-        const trendData = this.store.getTrendsData(7);
-        const uniqueSymptoms = [...new Set(this.store.data.symptoms.map(s => s.symptom))];
+        const uniqueSymptoms = this.store.getSymptomNames();
+        const ranges = [[7, '7D'], [30, '30D'], [90, '90D'], [365, '1Y'], ['all', 'All']];
 
         container.innerHTML = `
             <div class="card trends-card" style="margin-bottom: 2rem;">
-                <h3>Symptom Frequency (Last 7 Days)</h3>
-                <div class="chart-wrapper" style="position: relative; height: 350px; width: 100%; margin-top: 1rem;">
-                    <canvas id="symptomChart"></canvas>
+                <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 0.5rem;">
+                    <h3 id="trends-title">${this.trendsTitle()}</h3>
+                    <div class="range-picker">
+                        ${ranges.map(([value, label]) => `<button type="button" class="range-btn${value === this.trendsRange ? ' active' : ''}" data-range="${value}">${label}</button>`).join('')}
+                    </div>
                 </div>
+                <div id="chart-slot"></div>
+            </div>
+
+            <div class="card top-triggers-card" style="margin-bottom: 2rem;">
+                <h3>Top Triggers Across All Symptoms</h3>
+                <div id="top-triggers" style="margin-top: 1rem;"></div>
             </div>
 
             <div class="card analyzer-card">
@@ -207,15 +429,57 @@ class App {
             </div>
         `;
 
+        container.querySelectorAll('.range-btn').forEach(btn => {
+            btn.addEventListener('click', () => {
+                this.trendsRange = btn.dataset.range === 'all' ? 'all' : Number(btn.dataset.range);
+                container.querySelectorAll('.range-btn').forEach(b => b.classList.toggle('active', b === btn));
+                document.getElementById('trends-title').textContent = this.trendsTitle();
+                this.updateTrendsChart();
+            });
+        });
+
         const select = document.getElementById('symptom-analyzer-select');
         select.addEventListener('change', (e) => this.handleSymptomAnalysis(e.target.value));
+        this.renderTopTriggers();
 
-        const ctx = document.getElementById('symptomChart').getContext('2d');
+        // Chart.js is only fetched the first time Trends is opened
+        const slot = document.getElementById('chart-slot');
+        if (window.Chart) {
+            this.mountChart(slot);
+            return;
+        }
+
+        slot.innerHTML = `
+            <div class="chart-skeleton" style="height: 350px; margin-top: 1rem;">
+                ${[40, 65, 30, 80, 55, 70, 45].map(h => `<span style="height: ${h}%;"></span>`).join('')}
+            </div>
+        `;
+        window.ChartLoader.load().then(() => {
+            // The user may have left Trends while it was loading
+            if (slot.isConnected) this.mountChart(slot);
+        }).catch(error => {
+            console.error('Chart.js failed to load:', error);
+            if (slot.isConnected) slot.innerHTML = '<p class="muted" style="margin-top: 1rem;">The chart could not be loaded. Check your connection and open Trends again.</p>';
+        });
+    }
+
+    mountChart(slot) {
+        if (!this.chartWrapper) {
+            this.chartWrapper = document.createElement('div');
+            this.chartWrapper.className = 'chart-wrapper';
+            this.chartWrapper.style.cssText = 'position: relative; height: 350px; width: 100%; margin-top: 1rem;';
+            this.chartWrapper.innerHTML = '<canvas id="symptomChart"></canvas>';
+        }
+        slot.replaceWith(this.chartWrapper);
 
         if (this.chart) {
-            this.chart.destroy();
+            this.updateTrendsChart();
+            return;
         }
 
+        const trendData = this.chartData();
+        const ctx = this.chartWrapper.querySelector('canvas').getContext('2d');
+        const end = this.metrics.start('chart.create');
         this.chart = new Chart(ctx, {
             type: 'bar',
             data: {
@@ -225,6 +489,8 @@ class App {
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
+                normalized: true,
+                animation: this.chartAnimation(trendData),
                 plugins: {
                     legend: {
                         position: 'bottom',
@@ -240,7 +506,14 @@ class App {
                         titleColor: '#fff',
                         bodyColor: '#e2e8f0',
                         borderColor: 'rgba(255, 255, 255, 0.1)',
-                        borderWidth: 1
+                        borderWidth: 1,
+                        callbacks: {
+                            label: (item) => {
+                                const mean = item.dataset.meanSeverity[item.dataIndex];
+                                const max = item.dataset.maxSeverity[item.dataIndex];
+                                return mean === null ? `${item.dataset.label}: 0` : `${item.dataset.label}: ${item.raw} (severity avg ${mean}, max ${max})`;
+                            }
+                        }
                     }
                 },
                 scales: {
@@ -267,24 +540,100 @@ class App {
                 }
             }
         });
+        end();
     }
 
     handleSymptomAnalysis(symptomName) {
         const resultsContainer = document.getElementById('analyzer-results');
         if (!symptomName) {
+            this.analyzer.cancel();
             resultsContainer.innerHTML = `<div class="empty-state" style="padding: 2rem; border: 1px dashed var(--glass-border); border-radius: 12px; text-align: center; color: var(--text-muted);">Select a symptom to begin analysis</div>`;
             return;
         }
 
-        const correlations = this.store.getCorrelations(symptomName);
+        const noCorrelations = `<p class="muted">No strong dietary correlations found for "${symptomName}". Try logging more data!</p>`;
+
+        // Once the matrix is built this is a lookup, no analysis job needed
+        if (this.store.matrix) {
+            this.analyzer.cancel();
+            const correlations = this.store.getCorrelations(symptomName);
+            if (correlations.length === 0) {
+                resultsContainer.innerHTML = noCorrelations;
+            } else {
+                this.renderCorrelationResults(resultsContainer, symptomName, correlations, this.store.query({ symptom: symptomName }).count());
+            }
+            return;
+        }
 
-        if (correlations.length === 0) {
-            resultsContainer.innerHTML = `<p class="muted">No strong dietary correlations found for "${symptomName}". Try logging more data!</p>`;
+        const snapshot = this.store.getCorrelationSnapshot(symptomName);
+        if (!snapshot) {
+            this.analyzer.cancel();
+            resultsContainer.innerHTML = noCorrelations;
             return;
         }
 
+        const total = snapshot.symptomTimes.length;
+        resultsContainer.innerHTML = `<p class="muted">Analyzing "${symptomName}"...</p>`;
+
+        // Starting a new analysis cancels the one in flight
+        const end = this.metrics.start('analysis');
+        this.analyzer.analyze(snapshot, {
+            onProgress: (progress) => {
+                if (resultsContainer.isConnected) {
+                    this.renderCorrelationResults(resultsContainer, symptomName, progress.rows, progress.done, progress);
+                }
+            }
+        }).then(correlations => {
+            // A cancelled analysis is not a timing
+            if (correlations) end();
+            if (!correlations || !resultsContainer.isConnected) return;
+
+            if (correlations.length === 0) {
+                resultsContainer.innerHTML = noCorrelations;
+                return;
+            }
+            this.renderCorrelationResults(resultsContainer, symptomName, correlations, total);
+        });
+    }
+
+    renderTopTriggers() {
+        const container = document.getElementById('top-triggers');
+        if (!container) return;
+
+        if (!this.store.matrix) {
+            container.innerHTML = '<p class="muted">Analyzing your history...</p>';
+            return;
+        }
+
+        const top = this.store.getTopTriggers(5);
+        container.innerHTML = top.length === 0 ? '<p class="muted">Log meals and symptoms to see your strongest triggers.</p>' : `
+            <ul class="activity-list">
+                ${top.map(t => `
+                    <li class="activity-item">
+                        <div class="details">
+                            <strong>${t.name}</strong>
+                            <small style="text-transform: capitalize;">before ${t.symptom.replace(/_/g, ' ')}</small>
+                        </div>
+                        <span class="severity-badge">${t.count}x &middot; ${t.percentage}%</span>
+                    </li>
+                `).join('')}
+            </ul>
+        `;
+    }
+
+    renderCorrelationResults(resultsContainer, symptomName, correlations, total, progress) {
+        const percentDone = progress ? Math.round((progress.done / progress.total) * 100) : 100;
+
         resultsContainer.innerHTML = `
             <div class="correlation-list">
+                ${progress ? `
+                    <div class="analyzer-progress" style="margin-bottom: 1rem;">
+                        <p class="muted" style="font-size: 0.85rem; margin-bottom: 0.5rem;">Analyzing ${progress.done} of ${progress.total} occurrences...</p>
+                        <div class="progress-bar" style="height: 4px; background: rgba(255,255,255,0.05); border-radius: 2px; overflow: hidden;">
+                            <div style="height: 100%; width: ${percentDone}%; background: var(--primary-color);"></div>
+                        </div>
+                    </div>
+                ` : ''}
                 <h4 style="margin-bottom: 1rem;">Potential Triggers for <span style="color: var(--primary-color)">${symptomName}</span>:</h4>
                 ${correlations.map(c => `
                     <div class="correlation-item" style="margin-bottom: 1rem; padding: 1rem; background: var(--glass-bg); border-radius: 8px; border: 1px solid var(--glass-border);">
@@ -297,7 +646,7 @@ class App {
                         <div class="progress-bar" style="height: 8px; background: rgba(255,255,255,0.05); border-radius: 4px; overflow: hidden;">
                             <div style="height: 100%; width: ${c.percentage}%; background: ${c.percentage > 50 ? 'var(--primary-color)' : 'var(--secondary-color)'}; transition: width 0.6s ease;"></div>
                         </div>
-                        <p class="muted" style="font-size: 0.8rem; margin-top: 0.5rem;">Appeared in ${c.count} out of ${this.store.data.symptoms.filter(s => s.symptom === symptomName).length} instances.</p>
+                        <p class="muted" style="font-size: 0.8rem; margin-top: 0.5rem;">Appeared in ${c.count} out of ${total} instances.</p>
                     </div>
                 `).join('')}
             </div>
@@ -321,6 +670,23 @@ class App {
                     <input type="file" id="import-file-input" accept=".json" style="display: none;">
                 </div>
 
+                <label class="muted" style="display: block; font-size: 0.85rem; margin-top: 1rem;">
+                    <input type="checkbox" id="import-merge"> Merge into existing data (records with the same id are replaced)
+                </label>
+
+                <div id="import-progress" class="hidden" style="margin-top: 1rem;">
+                    <p class="muted" style="font-size: 0.85rem; margin-bottom: 0.5rem;"></p>
+                    <div class="progress-bar" style="height: 4px; background: rgba(255,255,255,0.05); border-radius: 2px; overflow: hidden;">
+                        <div style="height: 100%; width: 0%; background: var(--primary-color);"></div>
+                    </div>
+                </div>
+
+                <div class="export-options" style="display: flex; gap: 1rem; flex-wrap: wrap; align-items: center; margin-top: 1rem;">
+                    <label class="muted" style="font-size: 0.85rem;">From <input type="date" id="export-from" class="form-control" style="width: auto;"></label>
+                    <label class="muted" style="font-size: 0.85rem;">To <input type="date" id="export-to" class="form-control" style="width: auto;"></label>
+                    <label class="muted" style="font-size: 0.85rem;"><input type="checkbox" id="export-compact"> Compact file</label>
+                </div>
+
                 <div style="margin-top: 3rem; padding: 1.5rem; background: rgba(239, 68, 68, 0.05); border-radius: 12px; border: 1px solid rgba(239, 68, 68, 0.2);">
                     <h4 style="color: #f87171; margin-bottom: 0.5rem;">Danger Zone</h4>
                     <p class="muted" style="font-size: 0.85rem; margin-bottom: 1rem;">Clearing your data will permanently remove all logs from this browser.</p>
@@ -329,50 +695,69 @@ class App {
             </div>
         `;
 
-        document.getElementById('export-btn').onclick = () => this.store.exportData();
+        document.getElementById('export-btn').onclick = () => {
+            // Date inputs are whole local days
+            const from = document.getElementById('export-from').value;
+            const to = document.getElementById('export-to').value;
+            this.store.exportData({
+                compact: document.getElementById('export-compact').checked,
+                from: from ? new Date(`${from}T00:00:00`) : undefined,
+                to: to ? new Date(`${to}T23:59:59.999`) : undefined
+            });
+        };
 
         const importBtn = document.getElementById('import-trigger-btn');
         const fileInput = document.getElementById('import-file-input');
 
         importBtn.onclick = () => fileInput.click();
 
-        fileInput.onchange = (e) => {
+        fileInput.onchange = async (e) => {
             const file = e.target.files[0];
+            // Reset input so the same file can be selected again if needed
+            fileInput.value = '';
             if (!file) return;
 
-            if (confirm('Importing data will OVERWRITE your current data. Are you sure you want to proceed?')) {
-                const reader = new FileReader();
-                reader.onload = (event) => {
-                    try {
-                        const importedData = JSON.parse(event.target.result);
-                        const success = this.store.importData(importedData);
-
-                        if (success) {
-                            alert('Data imported successfully!');
-                            location.reload();
-                        } else {
-                            alert('Failed to import data. Please ensure the file is a valid VitalTrack export.');
-                        }
-                    } catch (err) {
-                        alert('Error parsing JSON file.');
-                        console.error(err);
+            const mode = document.getElementById('import-merge').checked ? 'merge' : 'replace';
+            if (mode === 'replace' && !confirm('Importing data will OVERWRITE your current data. Are you sure you want to proceed?')) return;
+
+            const progress = document.getElementById('import-progress');
+            const label = progress.querySelector('p');
+            const bar = progress.querySelector('.progress-bar div');
+            progress.classList.remove('hidden');
+            importBtn.disabled = true;
+
+            try {
+                const summary = await this.store.importFile(file, {
+                    mode,
+                    onProgress: ({ phase, done, total }) => {
+                        const percent = total ? Math.round((done / total) * 100) : 100;
+                        label.textContent = `${phase === 'read' ? 'Reading file' : 'Saving records'}... ${percent}%`;
+                        bar.style.width = `${percent}%`;
                     }
-                };
-                reader.readAsText(file);
+                });
+                alert(`Data imported successfully! ${summary.added} added, ${summary.updated} updated, ${summary.skipped} skipped.`);
+            } catch (err) {
+                alert(err instanceof SyntaxError ? 'Error parsing JSON file.' : 'Failed to import data. Please ensure the file is a valid VitalTrack export.');
+                console.error(err);
+            } finally {
+                progress.classList.add('hidden');
+                importBtn.disabled = false;
             }
-            // Reset input so the same file can be selected again if needed
-            fileInput.value = '';
         };
 
         document.getElementById('clear-data-btn').onclick = () => {
             if (confirm('Are you sure you want to clear ALL data? This cannot be undone.')) {
-                localStorage.removeItem(this.store.storageKey);
-                location.reload();
+                this.store.clear().then(() => location.reload());
             }
         };
     }
 }
 
+App.MIN_BAR_WIDTH = 6;
+App.ANIMATED_POINTS = 400;
+// Views that need the whole history rather than the recent partition
+App.HISTORY_VIEWS = ['logs', 'symptoms', 'trends'];
+
 document.addEventListener('DOMContentLoaded', () => {
     // Register Service Worker for PWA support
     if ('serviceWorker' in navigator) {
@@ -0,0 +1,43 @@
+// js/chart-loader.js
+
+// Loads Chart.js the first time a chart is needed rather than on every
+// launch. The vendored copy (Chart.js 4.4.0, precached by the service
+// worker) is tried first and the same version from a CDN only when it is
+// missing.
+
+window.ChartLoader = {
+    SOURCES: [
+        'js/vendor/chart.umd.min.js',
+        'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js',
+        'https://unpkg.com/chart.js@4.4.0/dist/chart.umd.min.js'
+    ],
+    promise: null,
+
+    load() {
+        if (window.Chart) return Promise.resolve(window.Chart);
+        if (!this.promise) {
+            this.promise = this.SOURCES
+                .reduce((previous, src) => previous.catch(() => this.inject(src)), Promise.reject(new Error('Chart.js not loaded')))
+                .catch(error => {
+                    // Let the next call retry, e.g. once back online
+                    this.promise = null;
+                    throw error;
+                });
+        }
+        return this.promise;
+    },
+
+    inject(src) {
+        return new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = src;
+            script.async = true;
+            script.onload = () => (window.Chart ? resolve(window.Chart) : reject(new Error(`${src} did not define Chart`)));
+            script.onerror = () => {
+                script.remove();
+                reject(new Error(`Failed to load ${src}`));
+            };
+            document.head.appendChild(script);
+        });
+    }
+};
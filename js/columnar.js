@@ -0,0 +1,301 @@
+// js/columnar.js
+
+// Column-per-field encoding of the meal and symptom arrays. Timestamps and
+// ids are stored as delta-encoded typed arrays, severities as a Uint8Array,
+// repeated strings such as symptom names as dictionary codes, and
+// ingredient lists as arrays of ingredient ids. Decoding gives back records
+// equal to the originals: a value a column cannot reproduce exactly is kept
+// verbatim as an exception, and each column lists the records that lack
+// its field.
+
+const typedArrays = { Float64Array, Uint8Array, Uint16Array, Uint32Array };
+
+const toBase64 = (array) => {
+    const bytes = new Uint8Array(array.buffer, array.byteOffset, array.byteLength);
+    let binary = '';
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+    return btoa(binary);
+};
+
+const fromBase64 = (type, base64) => {
+    const binary = atob(base64);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return new typedArrays[type](bytes.buffer);
+};
+
+const hasOwn = (record, field) => Object.prototype.hasOwnProperty.call(record, field);
+
+// Narrowest unsigned array able to hold `max`
+const narrowest = (values, max) => {
+    if (max <= 0xFF) return Uint8Array.from(values);
+    if (max <= 0xFFFF) return Uint16Array.from(values);
+    return Uint32Array.from(values);
+};
+
+const maxOf = (values) => {
+    let max = 0;
+    for (let i = 0; i < values.length; i++) if (values[i] > max) max = values[i];
+    return max;
+};
+
+// Small non-negative integers are stored as they are; other integers as
+// zigzag-encoded deltas from the previous value (sorted times and
+// clock-based ids sit close together), with any bits above 32 in a
+// second, narrower array; anything else as a Float64Array.
+const packNumbers = (values) => {
+    if (values.every(v => Number.isInteger(v) && v >= 0 && v <= 0xFFFF)) {
+        return { data: narrowest(values, maxOf(values)) };
+    }
+    if (values.every(Number.isSafeInteger)) {
+        const deltas = values.map((v, i) => {
+            const d = i === 0 ? 0 : v - values[i - 1];
+            return d >= 0 ? d * 2 : -d * 2 - 1;
+        });
+        const max = maxOf(deltas);
+        if (max <= 0xFFFFFFFF) return { base: values[0], data: narrowest(deltas, max) };
+        if (Number.isSafeInteger(max)) {
+            const high = deltas.map(d => Math.floor(d / 0x100000000));
+            return { base: values[0], data: Uint32Array.from(deltas, d => d % 0x100000000), high: narrowest(high, maxOf(high)) };
+        }
+    }
+    return { data: Float64Array.from(values) };
+};
+
+const unpackNumbers = ({ base, data, high }) => {
+    if (base === undefined) return data;
+    const values = new Float64Array(data.length);
+    let value = base;
+    for (let i = 0; i < data.length; i++) {
+        const z = high ? high[i] * 0x100000000 + data[i] : data[i];
+        value += z % 2 === 0 ? z / 2 : -(z + 1) / 2;
+        values[i] = value;
+    }
+    return values;
+};
+
+const DAY = 24 * 60 * 60 * 1000;
+const twoDigits = Array.from({ length: 100 }, (_, n) => String(n).padStart(2, '0'));
+
+// Same text as Date#toISOString, with the date part formatted once per day
+const isoFormatter = () => {
+    const days = new Map();
+    return (time) => {
+        const day = Math.floor(time / DAY);
+        let prefix = days.get(day);
+        if (prefix === undefined) {
+            const full = new Date(day * DAY).toISOString();
+            prefix = full.slice(0, full.indexOf('T') + 1);
+            days.set(day, prefix);
+        }
+        let rest = time - day * DAY;
+        const h = Math.floor(rest / 3600000);
+        rest -= h * 3600000;
+        const m = Math.floor(rest / 60000);
+        rest -= m * 60000;
+        const sec = Math.floor(rest / 1000);
+        const ms = rest - sec * 1000;
+        return `${prefix}${twoDigits[h]}:${twoDigits[m]}:${twoDigits[sec]}.${ms < 10 ? '00' : ms < 100 ? '0' : ''}${ms}Z`;
+    };
+};
+
+// Dictionary-encodes strings; returns [codes, dictionary]
+const dictionaryEncode = (values) => {
+    const codes = new Map();
+    const dictionary = [];
+    const encoded = values.map(value => {
+        if (!codes.has(value)) {
+            codes.set(value, codes.size);
+            dictionary.push(value);
+        }
+        return codes.get(value);
+    });
+    return [narrowest(encoded, dictionary.length - 1), dictionary];
+};
+
+window.Columnar = {
+    FORMAT: 'vitaltrack-columnar',
+
+    encode(data) {
+        return {
+            format: this.FORMAT,
+            version: 1,
+            meals: this.encodeRecords(data.meals),
+            symptoms: this.encodeRecords(data.symptoms),
+            settings: data.settings
+        };
+    },
+
+    decode(encoded) {
+        return {
+            meals: this.decodeRecords(encoded.meals),
+            symptoms: this.decodeRecords(encoded.symptoms),
+            settings: encoded.settings
+        };
+    },
+
+    isEncoded(value) {
+        return Boolean(value) && value.format === this.FORMAT;
+    },
+
+    // Typed arrays become base64 strings, so the encoding fits in localStorage
+    stringify(encoded) {
+        return JSON.stringify(encoded, (key, value) => (
+            ArrayBuffer.isView(value) ? { $typed: value.constructor.name, base64: toBase64(value) } : value
+        ));
+    },
+
+    // Parses saved text in either format and returns plain records
+    parse(text) {
+        const value = JSON.parse(text, (key, v) => (v && v.$typed ? fromBase64(v.$typed, v.base64) : v));
+        return this.isEncoded(value) ? this.decode(value) : value;
+    },
+
+    encodeRecords(records) {
+        const fields = new Set();
+        records.forEach(record => Object.keys(record).forEach(field => fields.add(field)));
+        return {
+            count: records.length,
+            columns: [...fields].map(field => this.encodeColumn(field, records))
+        };
+    },
+
+    decodeRecords({ count, columns }) {
+        const records = new Array(count);
+        for (let i = 0; i < count; i++) records[i] = {};
+
+        columns.forEach(column => {
+            const read = this.readers[column.type](column);
+            const { field } = column;
+            if (column.absent.length === 0 && column.exceptions.length === 0) {
+                for (let i = 0; i < count; i++) records[i][field] = read(i);
+                return;
+            }
+
+            const absent = new Set(column.absent);
+            const exceptions = new Map(column.exceptions);
+            for (let i = 0; i < count; i++) {
+                if (absent.has(i)) continue;
+                records[i][field] = exceptions.has(i) ? exceptions.get(i) : read(i);
+            }
+        });
+        return records;
+    },
+
+    // Records lacking the field are listed in `absent`; their slot in the
+    // column repeats the previous value so it costs nothing once packed
+    encodeColumn(field, records) {
+        const absent = [];
+        const present = [];
+        const values = new Array(records.length);
+        records.forEach((record, i) => {
+            if (hasOwn(record, field)) {
+                present.push(record[field]);
+                values[i] = record[field];
+            } else {
+                absent.push(i);
+                values[i] = i > 0 ? values[i - 1] : undefined;
+            }
+        });
+        const first = present[0];
+        for (let i = 0; i < values.length && values[i] === undefined; i++) values[i] = first;
+
+        const column = { field, type: this.columnType(field, present), absent, exceptions: [] };
+        this.writers[column.type](column, values);
+        return column;
+    },
+
+    columnType(field, values) {
+        const all = (test) => values.every(test);
+        const first = values[0];
+        if ((typeof first === 'string' || typeof first === 'number') && all(v => v === first)) return 'constant';
+        if (field === 'timestamp' && all(v => typeof v === 'string')) return 'time';
+        if (all(v => typeof v === 'number' && Number.isFinite(v))) return 'number';
+        if (field === 'ingredients' && all(v => typeof v === 'string')) return 'list';
+        if (all(v => typeof v === 'string')) return 'string';
+        return 'json';
+    },
+
+    writers: {
+        constant(column, values) {
+            column.value = values[0];
+        },
+
+        // Canonical ISO strings become epoch ms, other text is an exception
+        time(column, values) {
+            let previous = 0;
+            const times = values.map((value, i) => {
+                const time = Date.parse(value);
+                if (!Number.isNaN(time) && new Date(time).toISOString() === value) {
+                    previous = time;
+                } else {
+                    column.exceptions.push([i, value]);
+                }
+                return previous;
+            });
+            column.data = packNumbers(times);
+        },
+
+        number(column, values) {
+            column.data = packNumbers(values);
+        },
+
+        string(column, values) {
+            [column.data, column.dictionary] = dictionaryEncode(values);
+        },
+
+        // "Rice, Chili" -> ingredient ids [0, 1], with counts[i] ids per
+        // record. Text not in "a, b" form stays an exception.
+        list(column, values) {
+            const items = [];
+            const counts = values.map((value, i) => {
+                const parts = value.split(',').map(item => item.trim()).filter(item => item.length > 0);
+                if (parts.join(', ') !== value) {
+                    column.exceptions.push([i, value]);
+                    return 0;
+                }
+                items.push(...parts);
+                return parts.length;
+            });
+            [column.data, column.dictionary] = dictionaryEncode(items);
+            column.counts = narrowest(counts, maxOf(counts));
+        },
+
+        json(column, values) {
+            column.data = values;
+        }
+    },
+
+    // Each reader prepares a column once and returns i -> value
+    readers: {
+        constant: (column) => () => column.value,
+
+        time(column) {
+            const times = unpackNumbers(column.data);
+            const format = isoFormatter();
+            return (i) => format(times[i]);
+        },
+
+        number(column) {
+            const values = unpackNumbers(column.data);
+            return (i) => values[i];
+        },
+
+        string: (column) => (i) => column.dictionary[column.data[i]],
+
+        list(column) {
+            const { counts, data, dictionary } = column;
+            const offsets = new Uint32Array(counts.length + 1);
+            for (let i = 0; i < counts.length; i++) offsets[i + 1] = offsets[i] + counts[i];
+            return (i) => {
+                const items = [];
+                for (let j = offsets[i]; j < offsets[i + 1]; j++) items.push(dictionary[data[j]]);
+                return items.join(', ');
+            };
+        },
+
+        json: (column) => (i) => column.data[i]
+    }
+};
@@ -3,7 +3,8 @@
 // js/components/forms.js
 
 window.Forms = {
-    MealForm: (onSave) => {
+    // suggestIngredients(prefix) -> ingredient names, for autocomplete
+    MealForm: (onSave, suggestIngredients = null) => {
         const div = document.createElement('div');
         div.className = 'modal-content';
         div.innerHTML = `
@@ -19,6 +20,7 @@ window.Forms = {
             <div class="form-group">
                 <label>Ingredients (optional)</label>
                 <textarea id="meal-ingredients" placeholder="Comma separated list..."></textarea>
+                <div class="ingredient-suggestions"></div>
             </div>
             <div class="form-group">
                 <label>Time</label>
@@ -34,6 +36,30 @@ window.Forms = {
         now.setMinutes(now.getMinutes() - now.getTimezoneOffset());
         timeInput.value = now.toISOString().slice(0, 16);
 
+        if (suggestIngredients) {
+            const ingredientsInput = div.querySelector('#meal-ingredients');
+            const suggestions = div.querySelector('.ingredient-suggestions');
+
+            // Suggests completions for the ingredient after the last comma
+            const update = () => {
+                const parts = ingredientsInput.value.split(',');
+                const current = parts[parts.length - 1].trim();
+                const listed = new Set(parts.slice(0, -1).map(p => p.trim().toLowerCase()));
+                const names = current ? suggestIngredients(current).filter(name => !listed.has(name.toLowerCase())) : [];
+                suggestions.innerHTML = names.map(name => `<button type="button" class="suggestion-chip">${name}</button>`).join('');
+            };
+
+            ingredientsInput.addEventListener('input', update);
+            suggestions.addEventListener('click', (e) => {
+                const chip = e.target.closest('.suggestion-chip');
+                if (!chip) return;
+                const parts = ingredientsInput.value.split(',').slice(0, -1).map(p => p.trim());
+                ingredientsInput.value = [...parts, chip.textContent].join(', ') + ', ';
+                ingredientsInput.focus();
+                update();
+            });
+        }
+
         div.querySelector('form').onsubmit = (e) => {
             e.preventDefault();
             onSave({
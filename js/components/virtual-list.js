@@ -0,0 +1,132 @@
+// js/components/virtual-list.js
+
+// Windowed list: only rows inside the scroll viewport plus an overscan
+// buffer exist in the DOM. Rows share one height (measured from the first
+// row unless given) and rendered rows are cached by key, so scrolling only
+// creates the rows that come into view and removes the ones that leave.
+
+window.VirtualList = class VirtualList {
+    constructor({ container, count, renderRow, getKey = null, rowHeight = null, overscan = 6, scroller = null }) {
+        this.container = container;
+        this.count = count;
+        this.renderRow = renderRow;
+        this.keyed = Boolean(getKey);
+        this.getKey = getKey || ((index) => index);
+        this.rowHeight = rowHeight;
+        this.overscan = overscan;
+        this.scroller = scroller || container.closest('.content') || document.scrollingElement || document.documentElement;
+        this.rows = new Map(); // key -> row element
+        this.frame = null;
+
+        this.list = document.createElement('div');
+        this.list.className = 'virtual-list';
+        this.list.style.position = 'relative';
+        this.container.appendChild(this.list);
+
+        this.onScroll = () => {
+            if (this.frame) return;
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.update();
+            });
+        };
+        this.scroller.addEventListener('scroll', this.onScroll, { passive: true });
+        window.addEventListener('resize', this.onScroll);
+
+        this.update();
+    }
+
+    createRow(index) {
+        const template = document.createElement('template');
+        template.innerHTML = this.renderRow(index).trim();
+        const row = template.content.firstElementChild;
+        row.classList.add('virtual-row');
+        row.style.position = 'absolute';
+        row.style.left = '0';
+        row.style.right = '0';
+        return row;
+    }
+
+    measure() {
+        if (this.rowHeight || this.count === 0) return;
+
+        const probe = this.createRow(0);
+        probe.style.visibility = 'hidden';
+        this.list.appendChild(probe);
+        const style = getComputedStyle(probe);
+        const height = probe.offsetHeight;
+        probe.remove();
+        // Nothing to measure until the list is laid out
+        if (height > 0) this.rowHeight = height + parseFloat(style.marginTop) + parseFloat(style.marginBottom);
+    }
+
+    visibleRange() {
+        const rowHeight = this.rowHeight || VirtualList.DEFAULT_ROW_HEIGHT;
+        const listTop = this.list.getBoundingClientRect().top - this.scroller.getBoundingClientRect().top;
+        const viewport = this.scroller.clientHeight || window.innerHeight;
+
+        const first = Math.floor(Math.max(0, -listTop) / rowHeight);
+        const last = Math.ceil(Math.max(0, viewport - listTop) / rowHeight);
+        return {
+            start: Math.max(0, first - this.overscan),
+            end: Math.min(this.count, last + this.overscan)
+        };
+    }
+
+    update() {
+        this.measure();
+        const rowHeight = this.rowHeight || VirtualList.DEFAULT_ROW_HEIGHT;
+        this.list.style.height = `${this.count * rowHeight}px`;
+
+        const { start, end } = this.visibleRange();
+        const visible = new Map();
+        for (let index = start; index < end; index++) {
+            visible.set(this.getKey(index), index);
+        }
+
+        this.rows.forEach((row, key) => {
+            if (!visible.has(key)) {
+                row.remove();
+                this.rows.delete(key);
+            }
+        });
+
+        // Keep DOM order equal to visual order for text selection and screen readers
+        let cursor = this.list.firstElementChild;
+        visible.forEach((index, key) => {
+            let row = this.rows.get(key);
+            if (!row) {
+                row = this.createRow(index);
+                this.rows.set(key, row);
+            }
+            row.style.transform = `translateY(${index * rowHeight}px)`;
+
+            if (row === cursor) {
+                cursor = cursor.nextElementSibling;
+            } else {
+                this.list.insertBefore(row, cursor);
+            }
+        });
+    }
+
+    // The underlying data changed. Keyed lists keep the rows whose keys are
+    // still visible; index-keyed rows may now show other data, so they go.
+    refresh(count = this.count) {
+        this.count = count;
+        if (!this.keyed) {
+            this.rows.forEach(row => row.remove());
+            this.rows.clear();
+        }
+        this.update();
+    }
+
+    destroy() {
+        if (this.frame) cancelAnimationFrame(this.frame);
+        this.scroller.removeEventListener('scroll', this.onScroll);
+        window.removeEventListener('resize', this.onScroll);
+        this.rows.clear();
+        this.list.remove();
+    }
+};
+
+window.VirtualList.DEFAULT_ROW_HEIGHT = 96;
@@ -0,0 +1,33 @@
+// js/correlation-worker.js
+
+// Runs Root Cause Analyzer jobs off the UI thread. Messages:
+//   in:  { type: 'run', jobId, snapshot } | { type: 'cancel', jobId }
+//   out: { type: 'progress', jobId, done, total, rows } | { type: 'result', jobId, result }
+// A snapshot with symptomKeys builds the full symptom x trigger matrix.
+
+importScripts('correlation.js');
+
+const jobs = new Map();
+
+self.onmessage = (event) => {
+    const { type, jobId, snapshot } = event.data;
+
+    if (type === 'cancel') {
+        const job = jobs.get(jobId);
+        if (job) job.cancelled = true;
+        return;
+    }
+
+    if (type === 'run') {
+        const job = { cancelled: false };
+        jobs.set(jobId, job);
+
+        self.CorrelationEngine.run(snapshot, {
+            isCancelled: () => job.cancelled,
+            onProgress: (progress) => self.postMessage({ type: 'progress', jobId, ...progress })
+        }).then(result => {
+            jobs.delete(jobId);
+            if (result) self.postMessage({ type: 'result', jobId, result });
+        });
+    }
+};
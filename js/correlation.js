@@ -0,0 +1,140 @@
+// js/correlation.js
+
+// Sweep-line trigger counting shared by Store and the analysis worker, so it
+// attaches to `self` (the window on the page, the global scope in a worker).
+
+self.CorrelationEngine = {
+    HOUR: 1000 * 60 * 60,
+
+    // Ingredients of a comma separated list, trimmed and with inner spaces
+    // collapsed, dropping repeats that differ only in case
+    ingredients(text) {
+        if (!text) return [];
+        const seen = new Set();
+        const names = [];
+        text.split(',').forEach(part => {
+            const name = part.trim().replace(/\s+/g, ' ');
+            const key = name.toLowerCase();
+            if (name && !seen.has(key)) {
+                seen.add(key);
+                names.push(name);
+            }
+        });
+        return names;
+    },
+
+    ingredientKey(name) {
+        return name.trim().replace(/\s+/g, ' ').toLowerCase();
+    },
+
+    // Sliding window over time-sorted meals. advance(time) moves it to cover
+    // meals between minGap and maxGap before `time` and returns the active
+    // trigger -> meal count map. One pointer admits meals as the window's
+    // upper edge passes them, the other evicts them as the lower edge does,
+    // so every meal enters and leaves once; `moves` counts both. Times passed
+    // must not decrease.
+    createWindow({ mealTimes, mealTriggers, minGap = this.HOUR, maxGap = 12 * this.HOUR }) {
+        const active = new Map();
+        let enter = 0;
+        let leave = 0;
+
+        const frame = {
+            moves: 0,
+            advance(time) {
+                while (enter < mealTimes.length && mealTimes[enter] <= time - minGap) {
+                    mealTriggers[enter].forEach(trigger => active.set(trigger, (active.get(trigger) || 0) + 1));
+                    enter++;
+                    frame.moves++;
+                }
+
+                while (leave < enter && mealTimes[leave] < time - maxGap) {
+                    mealTriggers[leave].forEach(trigger => {
+                        const remaining = active.get(trigger) - 1;
+                        if (remaining === 0) active.delete(trigger);
+                        else active.set(trigger, remaining);
+                    });
+                    leave++;
+                    frame.moves++;
+                }
+                return active;
+            }
+        };
+        return frame;
+    },
+
+    // Counts, per trigger, how many symptom occurrences had at least one meal
+    // carrying it in their window. Both time arrays must be sorted ascending;
+    // mealTriggers is parallel to mealTimes. With symptomKeys (parallel to
+    // symptomTimes) the counts are split per key: key -> trigger -> count.
+    // step(n) advances over the next n occurrences, so a sweep can be sliced.
+    createSweep(input) {
+        const { symptomTimes, symptomKeys } = input;
+        const frame = this.createWindow(input);
+        const counts = new Map();
+
+        const sweep = {
+            counts,
+            frame,
+            position: 0,
+            step(limit) {
+                const end = Math.min(symptomTimes.length, sweep.position + limit);
+                for (let s = sweep.position; s < end; s++) {
+                    const active = frame.advance(symptomTimes[s]);
+
+                    let target = counts;
+                    if (symptomKeys) {
+                        target = counts.get(symptomKeys[s]);
+                        if (!target) {
+                            target = new Map();
+                            counts.set(symptomKeys[s], target);
+                        }
+                    }
+                    active.forEach((_, trigger) => target.set(trigger, (target.get(trigger) || 0) + 1));
+                }
+                sweep.position = end;
+                return end < symptomTimes.length;
+            }
+        };
+        return sweep;
+    },
+
+    sweep(input) {
+        const sweep = this.createSweep(input);
+        sweep.step(input.symptomTimes.length);
+        return sweep.counts;
+    },
+
+    // Runs a sweep in slices and yields to the event loop between them, so
+    // a newer request can cancel it. Resolves with the ranked rows (or the
+    // per-key counts for a keyed sweep), or null once isCancelled() is true.
+    run(snapshot, { chunkSize = 500, onProgress, isCancelled = () => false } = {}) {
+        const sweep = this.createSweep(snapshot);
+        const total = snapshot.symptomTimes.length;
+
+        return new Promise(resolve => {
+            const next = () => {
+                if (isCancelled()) return resolve(null);
+
+                const more = sweep.step(chunkSize);
+                const rows = snapshot.symptomKeys ? undefined : this.rank(sweep.counts, sweep.position, snapshot.triggers);
+                if (!more) return resolve(rows || sweep.counts);
+
+                if (onProgress) onProgress({ done: sweep.position, total, rows });
+                setTimeout(next, 0);
+            };
+            next();
+        });
+    },
+
+    // Sorted { name, count, percentage } rows as shown by the analyzer.
+    // When the counts are keyed by trigger id, `names` maps them back.
+    rank(counts, occurrences, names) {
+        return [...counts.entries()]
+            .map(([trigger, count]) => ({
+                name: names ? names[trigger] : trigger,
+                count,
+                percentage: Math.round((count / occurrences) * 100)
+            }))
+            .sort((a, b) => b.count - a.count);
+    }
+};
@@ -0,0 +1,44 @@
+// js/ids.js
+
+// Record ids: epoch milliseconds times 1000, then a sequence digit, then a
+// two-digit node number drawn once per tab. They sort by creation time,
+// stay exact as numbers (below 2^53 until the year 2255) and never repeat
+// within a page, however many are made in one millisecond; a busy
+// millisecond simply borrows from the next. Every id a tab makes ends in
+// its node number, so tabs with different numbers can never make the same
+// id. Two tabs draw the same number 1 time in NODES, and a tab that
+// receives another tab's id ending in its own number draws again.
+
+window.RecordIds = {
+    SCALE: 1000,
+    NODES: 100,
+    node: Math.floor(Math.random() * 100),
+    last: 0,
+
+    // The smallest id ending in this tab's node that is above both the
+    // last id and the first id of `now`
+    next(now = Date.now()) {
+        const floor = Math.max(now * this.SCALE, this.last + 1);
+        this.last = floor + (this.node - (floor % this.NODES) + this.NODES) % this.NODES;
+        return this.last;
+    },
+
+    // Keeps later ids above one that already exists (loaded, imported or
+    // made by another tab)
+    observe(id) {
+        if (Number.isSafeInteger(id) && id > this.last) this.last = id;
+    },
+
+    // For ids made by another tab that is open now
+    observeRemote(id) {
+        this.observe(id);
+        if (Number.isSafeInteger(id) && id % this.NODES === this.node) {
+            this.node = (this.node + 1 + Math.floor(Math.random() * (this.NODES - 1))) % this.NODES;
+        }
+    },
+
+    // Creation time in ms of an id made by next()
+    timeOf(id) {
+        return Math.floor(id / this.SCALE);
+    }
+};
@@ -0,0 +1,134 @@
+// js/import.js
+
+// Incremental reader for VitalTrack export files. push() takes the file
+// text in arbitrary pieces and returns the meal and symptom records that
+// were completed by it, so only the record being read is ever buffered,
+// never the whole file. Each record goes through JSON.parse on its own.
+
+window.ImportParser = class ImportParser {
+    constructor() {
+        this.depth = 0;
+        this.inString = false;
+        this.escaped = false;
+        this.key = '';          // text of the last key-level string
+        this.keyText = null;    // key-level string being read
+        this.field = null;      // top-level key whose value is being read
+        this.capture = null;    // pieces of the record being read
+        this.captureDepth = 0;
+        this.settings = null;
+        this.seen = new Set();
+        this.started = false;
+    }
+
+    // Returns [{ kind: 'meals' | 'symptoms', record }] completed in `text`
+    push(text) {
+        const records = [];
+        let start = this.capture ? 0 : -1;
+
+        for (let i = 0; i < text.length; i++) {
+            const ch = text[i];
+
+            if (this.inString) {
+                if (this.escaped) this.escaped = false;
+                else if (ch === '\\') this.escaped = true;
+                else if (ch === '"') {
+                    this.inString = false;
+                    if (this.keyText !== null) {
+                        this.key = this.keyText;
+                        this.keyText = null;
+                    }
+                } else if (this.keyText !== null) this.keyText += ch;
+                continue;
+            }
+
+            if (!this.started) {
+                if (/\s/.test(ch)) continue;
+                if (ch !== '{') throw new Error('Invalid data format: expected a JSON object.');
+                this.started = true;
+            }
+
+            switch (ch) {
+                case '"':
+                    this.inString = true;
+                    if (this.depth === 1 && !this.capture) this.keyText = '';
+                    break;
+                case ':':
+                    if (this.depth === 1) this.field = this.key;
+                    break;
+                case '{':
+                case '[': {
+                    this.depth++;
+                    const recordStart = ch === '{' && this.depth === 3 && this.isRecordField();
+                    const settingsStart = ch === '{' && this.depth === 2 && this.field === 'settings';
+                    if (!this.capture && (recordStart || settingsStart)) {
+                        this.capture = [];
+                        this.captureDepth = this.depth;
+                        start = i;
+                    }
+                    if (ch === '[' && this.depth === 2 && this.isRecordField()) this.seen.add(this.field);
+                    break;
+                }
+                case '}':
+                case ']':
+                    if (this.capture && this.depth === this.captureDepth) {
+                        this.capture.push(text.slice(start, i + 1));
+                        const value = JSON.parse(this.capture.join(''));
+                        this.capture = null;
+                        start = -1;
+                        if (this.depth === 2) this.settings = value;
+                        else records.push({ kind: this.field, record: value });
+                    }
+                    this.depth--;
+                    break;
+            }
+        }
+
+        if (this.capture && start >= 0) this.capture.push(text.slice(start));
+        return records;
+    }
+
+    isRecordField() {
+        return this.field === 'meals' || this.field === 'symptoms';
+    }
+
+    // Checks the file was complete and returns its settings (or null)
+    end() {
+        if (!this.started || this.depth !== 0 || this.inString) {
+            throw new Error('Invalid data format: the file ended unexpectedly.');
+        }
+        if (!this.seen.has('meals') || !this.seen.has('symptoms')) {
+            throw new Error('Invalid data format: missing meals or symptoms arrays.');
+        }
+        return this.settings;
+    }
+
+    // Reads a File or Blob as text, one slice at a time
+    static async *readText(blob, sliceSize = 1024 * 1024) {
+        const decoder = new TextDecoder();
+        for (let offset = 0; offset < blob.size; offset += sliceSize) {
+            const buffer = await new Promise((resolve, reject) => {
+                const reader = new FileReader();
+                reader.onload = () => resolve(reader.result);
+                reader.onerror = () => reject(reader.error);
+                reader.readAsArrayBuffer(blob.slice(offset, offset + sliceSize));
+            });
+            const end = Math.min(blob.size, offset + sliceSize);
+            yield { text: decoder.decode(buffer, { stream: end < blob.size }), done: end, total: blob.size };
+        }
+    }
+
+    // Records the app can index and display; anything else is skipped
+    static isValid(kind, record) {
+        if (!record || typeof record !== 'object' || Array.isArray(record)) return false;
+        if (typeof record.id !== 'number' && typeof record.id !== 'string') return false;
+        if (typeof record.timestamp !== 'string' || Number.isNaN(Date.parse(record.timestamp))) return false;
+
+        if (kind === 'meals') {
+            return typeof record.name === 'string' && record.name.length > 0 &&
+                (record.ingredients === undefined || typeof record.ingredients === 'string');
+        }
+        const severity = Number(record.severity);
+        return typeof record.symptom === 'string' && record.symptom.length > 0 &&
+            Number.isFinite(severity) && severity >= 1 && severity <= 10;
+    }
+};
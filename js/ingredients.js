@@ -0,0 +1,61 @@
+// js/ingredients.js
+
+// Interned ingredient dictionary with an inverted index from each
+// ingredient to the meals containing it, kept sorted by time. Spellings
+// that differ only in case or spacing ("Onion", "onion ") share one id;
+// the first spelling seen is the one displayed.
+
+window.IngredientIndex = class IngredientIndex {
+    constructor() {
+        this.names = [];      // id -> display name
+        this.ids = new Map(); // normalized name -> id
+        this.meals = [];      // id -> TimeIndex of the meals containing it
+    }
+
+    // Interns the meal's ingredients, indexes the meal under each and
+    // returns their ids
+    add(meal) {
+        return window.CorrelationEngine.ingredients(meal.ingredients).map(name => {
+            const id = this.intern(name);
+            this.meals[id].insert(meal);
+            return id;
+        });
+    }
+
+    intern(name) {
+        const key = window.CorrelationEngine.ingredientKey(name);
+        let id = this.ids.get(key);
+        if (id === undefined) {
+            id = this.names.length;
+            this.ids.set(key, id);
+            this.names.push(name);
+            this.meals.push(new window.TimeIndex());
+        }
+        return id;
+    }
+
+    lookup(name) {
+        return this.ids.get(window.CorrelationEngine.ingredientKey(name));
+    }
+
+    // TimeIndex of the meals containing `name`, or null if it was never eaten
+    mealsWith(name) {
+        const id = this.lookup(name);
+        return id === undefined ? null : this.meals[id];
+    }
+
+    // Most eaten ingredients with a word starting with `prefix`
+    suggest(prefix, limit = 8) {
+        const key = window.CorrelationEngine.ingredientKey(prefix);
+        if (!key) return [];
+
+        const matches = [];
+        this.ids.forEach((id, name) => {
+            if (name.startsWith(key) || name.includes(` ${key}`)) matches.push(id);
+        });
+        return matches
+            .sort((a, b) => this.meals[b].length - this.meals[a].length)
+            .slice(0, limit)
+            .map(id => this.names[id]);
+    }
+};
@@ -0,0 +1,38 @@
+// js/memo.js
+
+// Small LRU cache for derived view models. Every entry belongs to one
+// store revision: the first lookup at a newer revision drops them all.
+
+window.MemoCache = class MemoCache {
+    constructor(limit = 32) {
+        this.limit = limit;
+        this.revision = null;
+        this.entries = new Map();
+        this.hits = 0;
+        this.misses = 0;
+    }
+
+    get(revision, key, compute) {
+        if (revision !== this.revision) {
+            this.entries.clear();
+            this.revision = revision;
+        }
+
+        if (this.entries.has(key)) {
+            // Re-insert so Map order tracks recency
+            const value = this.entries.get(key);
+            this.entries.delete(key);
+            this.entries.set(key, value);
+            this.hits++;
+            return value;
+        }
+
+        this.misses++;
+        const value = compute();
+        this.entries.set(key, value);
+        if (this.entries.size > this.limit) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+        return value;
+    }
+};
@@ -0,0 +1,116 @@
+// js/metrics.js
+
+// Timings and counters for the app's hot paths. time() brackets work with
+// performance.mark/measure, so it shows up as "vitaltrack:<name>" in the
+// browser's performance panel, and keeps the last SAMPLES durations per name
+// for summary() to report p50/p95. Each mark is cleared once measured; the
+// measures stay visible to getEntriesByType('measure') and observers until
+// MEASURE_BUFFER of them have been made, when they are cleared together so
+// long sessions do not fill the timeline buffer.
+
+const hasUserTiming = typeof performance !== 'undefined' && typeof performance.mark === 'function'
+    && typeof performance.measure === 'function';
+let markSeq = 0;
+
+window.Metrics = class Metrics {
+    constructor() {
+        this.timings = new Map();
+        this.counters = new Map();
+        this.measures = 0;
+    }
+
+    // Runs fn and records how long it took; a returned promise is timed
+    // until it settles
+    time(name, fn) {
+        const end = this.start(name);
+        let result;
+        try {
+            result = fn();
+        } catch (error) {
+            end();
+            throw error;
+        }
+        if (result && typeof result.then === 'function') {
+            return result.finally(end);
+        }
+        end();
+        return result;
+    }
+
+    // Starts a timing and returns the function that ends it
+    start(name) {
+        const label = `vitaltrack:${name}`;
+        const mark = `${label}#${++markSeq}`;
+        const started = performance.now();
+        if (hasUserTiming) performance.mark(mark);
+        return () => {
+            let duration = performance.now() - started;
+            if (hasUserTiming) {
+                const measure = performance.measure(label, mark);
+                if (measure) duration = measure.duration;
+                performance.clearMarks(mark);
+                this.trimMeasures();
+            }
+            this.record(name, duration);
+        };
+    }
+
+    trimMeasures() {
+        if (++this.measures < Metrics.MEASURE_BUFFER) return;
+        this.measures = 0;
+        const names = new Set(performance.getEntriesByType('measure')
+            .map(entry => entry.name)
+            .filter(name => name.startsWith('vitaltrack:')));
+        names.forEach(name => performance.clearMeasures(name));
+    }
+
+    record(name, ms) {
+        let samples = this.timings.get(name);
+        if (!samples) {
+            samples = { count: 0, values: [] };
+            this.timings.set(name, samples);
+        }
+        samples.count++;
+        samples.values.push(ms);
+        if (samples.values.length > Metrics.SAMPLES) samples.values.shift();
+    }
+
+    count(name, amount = 1) {
+        this.counters.set(name, (this.counters.get(name) || 0) + amount);
+    }
+
+    // { timings: { name: { count, p50, p95, max } }, counters: { name: n } },
+    // times in ms over the kept samples
+    summary() {
+        const timings = {};
+        [...this.timings.keys()].sort().forEach(name => {
+            const { count, values } = this.timings.get(name);
+            const sorted = [...values].sort((a, b) => a - b);
+            timings[name] = {
+                count,
+                p50: Metrics.round(Metrics.percentile(sorted, 50)),
+                p95: Metrics.round(Metrics.percentile(sorted, 95)),
+                max: Metrics.round(sorted[sorted.length - 1])
+            };
+        });
+        return { timings, counters: Object.fromEntries([...this.counters].sort()) };
+    }
+
+    reset() {
+        this.timings.clear();
+        this.counters.clear();
+    }
+
+    // Nearest-rank percentile of an ascending array
+    static percentile(sorted, p) {
+        if (sorted.length === 0) return 0;
+        return sorted[Math.max(0, Math.ceil((p / 100) * sorted.length) - 1)];
+    }
+
+    static round(ms) {
+        return Math.round(ms * 100) / 100;
+    }
+};
+
+window.Metrics.SAMPLES = 200;
+window.Metrics.MEASURE_BUFFER = 1000;
@@ -0,0 +1,131 @@
+// js/query.js
+
+// Lazy reads over one TimeIndex. Nothing is copied: iterating walks the
+// index between two binary-searched time bounds and applies the filters the
+// index cannot answer (severity, ingredient) record by record. Bounds are
+// found again on every read, so a query sees records inserted after it was
+// made. Inserting while an iteration is in progress is not supported.
+// Given `metrics`, reads are timed as "query" and the records they visit
+// are counted as "records.scanned".
+
+window.RecordQuery = class RecordQuery {
+    constructor(index, { from = -Infinity, to = Infinity, order = 'asc', filter = null, offset = 0, limit = Infinity, cursor = null, metrics = null } = {}) {
+        this.index = index;
+        this.from = from;
+        this.to = to;
+        this.descending = order === 'desc';
+        this.filter = filter;
+        this.offset = offset;
+        this.limit = limit;
+        this.cursor = cursor;
+        this.metrics = metrics;
+    }
+
+    // Opaque position after `record`, for resuming with { cursor }
+    static cursorFor(record) {
+        return JSON.stringify([window.TimeIndex.timeOf(record), record.id]);
+    }
+
+    // Index positions [lo, hi) left to read
+    bounds() {
+        const index = this.index;
+        let lo = index.lowerBound(this.from);
+        let hi = index.upperBound(this.to);
+
+        if (this.cursor) {
+            const [time, id] = JSON.parse(this.cursor);
+            let pos = -1;
+            for (let i = index.lowerBound(time), end = index.upperBound(time); i < end; i++) {
+                if (index.records[i].id === id) pos = i;
+            }
+            if (this.descending) {
+                hi = Math.min(hi, pos >= 0 ? pos : index.lowerBound(time));
+            } else {
+                lo = Math.max(lo, pos >= 0 ? pos + 1 : index.upperBound(time));
+            }
+        }
+        return { lo, hi: Math.max(lo, hi) };
+    }
+
+    *[Symbol.iterator]() {
+        const { lo, hi } = this.bounds();
+        const records = this.index.records;
+        const step = this.descending ? -1 : 1;
+        let skip = this.offset;
+        let left = this.limit;
+
+        // Without a filter the offset is plain index arithmetic
+        let i = this.descending ? hi - 1 : lo;
+        if (!this.filter) {
+            i += step * skip;
+            skip = 0;
+        }
+
+        let scanned = 0;
+        try {
+            for (; left > 0 && i >= lo && i < hi; i += step) {
+                scanned++;
+                const record = records[i];
+                if (this.filter && !this.filter(record)) continue;
+                if (skip > 0) {
+                    skip--;
+                    continue;
+                }
+                left--;
+                yield record;
+            }
+        } finally {
+            if (this.metrics) this.metrics.count('records.scanned', scanned);
+        }
+    }
+
+    count() {
+        if (!this.filter) {
+            const { lo, hi } = this.bounds();
+            return Math.max(0, Math.min(this.limit, hi - lo - this.offset));
+        }
+        let count = 0;
+        for (const _ of this) count++;
+        return count;
+    }
+
+    // The n-th matching record; constant time when there is no filter
+    at(n) {
+        if (n < 0 || n >= this.limit) return undefined;
+        for (const record of new RecordQuery(this.index, { ...this.options(), offset: this.offset + n, limit: 1 })) {
+            return record;
+        }
+        return undefined;
+    }
+
+    first() {
+        return this.at(0);
+    }
+
+    toArray() {
+        return this.metrics ? this.metrics.time('query', () => [...this]) : [...this];
+    }
+
+    // One page plus the cursor of the page after it (null on the last page)
+    page() {
+        const records = this.toArray();
+        const last = records[records.length - 1];
+        return {
+            records,
+            cursor: last && records.length === this.limit ? RecordQuery.cursorFor(last) : null
+        };
+    }
+
+    options() {
+        return {
+            from: this.from,
+            to: this.to,
+            order: this.descending ? 'desc' : 'asc',
+            filter: this.filter,
+            offset: this.offset,
+            limit: this.limit,
+            cursor: this.cursor,
+            metrics: this.metrics
+        };
+    }
+};
@@ -0,0 +1,74 @@
+// js/rollups.js
+
+// Per local calendar day, per symptom: occurrence count and severity
+// sum/max. Kept current on insert, so trend queries read one small entry
+// per day whatever the size of the history.
+
+window.DailyRollups = class DailyRollups {
+    constructor(symptoms = []) {
+        this.days = new Map(); // dayKey -> symptom -> { count, severitySum, maxSeverity }
+        this.firstDay = null;
+        symptoms.forEach(s => this.add(s));
+    }
+
+    add(record) {
+        const day = window.TimeIndex.dayKey(window.TimeIndex.timeOf(record));
+        let row = this.days.get(day);
+        if (!row) {
+            row = new Map();
+            this.days.set(day, row);
+            if (this.firstDay === null || day < this.firstDay) this.firstDay = day;
+        }
+
+        let entry = row.get(record.symptom);
+        if (!entry) {
+            entry = { count: 0, severitySum: 0, maxSeverity: 0 };
+            row.set(record.symptom, entry);
+        }
+        const severity = Number(record.severity) || 0;
+        entry.count++;
+        entry.severitySum += severity;
+        entry.maxSeverity = Math.max(entry.maxSeverity, severity);
+    }
+
+    get(day) {
+        return this.days.get(day);
+    }
+};
+
+// Merges runs of adjacent bars so trend data has at most `maxBars` bars.
+// Each merged bar is labelled with its first bar; means are weighted by count.
+window.DailyRollups.downsample = (trendData, maxBars) => {
+    const size = Math.ceil(trendData.labels.length / Math.max(1, maxBars));
+    if (size <= 1) return trendData;
+
+    const groups = (values, merge) => {
+        const merged = [];
+        for (let i = 0; i < values.length; i += size) merged.push(merge(i, Math.min(values.length, i + size)));
+        return merged;
+    };
+    return {
+        ...trendData,
+        labels: groups(trendData.labels, (i) => trendData.labels[i]),
+        datasets: trendData.datasets.map(dataset => {
+            const { data, meanSeverity, maxSeverity } = dataset;
+            const sum = (from, to, value) => {
+                let total = 0;
+                for (let j = from; j < to; j++) total += value(j);
+                return total;
+            };
+            return {
+                ...dataset,
+                data: groups(data, (from, to) => sum(from, to, j => data[j])),
+                meanSeverity: groups(data, (from, to) => {
+                    const count = sum(from, to, j => data[j]);
+                    return count ? Math.round((sum(from, to, j => data[j] * (meanSeverity[j] || 0)) / count) * 10) / 10 : null;
+                }),
+                maxSeverity: groups(data, (from, to) => {
+                    const highest = Math.max(...maxSeverity.slice(from, to).map(v => (v === null ? -1 : v)));
+                    return highest < 0 ? null : highest;
+                })
+            };
+        })
+    };
+};
@@ -0,0 +1,509 @@
+// js/storage.js
+
+// Storage backends for Store. Every backend exposes the same async surface:
+//   load()              -> { meals, symptoms, settings }
+//   save(data, change)  -> persists the records in `change` ({ kind, record } or
+//                          { kind, records }) when given, otherwise replaces
+//                          everything with `data`
+//   clear()             -> removes all persisted data
+//   saveRecent(part)    -> keeps Store's small recent partition apart from
+//   loadRecent()           the history, so startup can read just that
+//                          (null until one was saved)
+// and a `recordWrites` flag telling whether save() can write just the
+// changed records or always rewrites everything. Backends also keep
+// `bytesWritten`, the total they have persisted (for IndexedDB an estimate
+// from the records' JSON size).
+
+const emptyData = () => ({
+    meals: [],
+    symptoms: [],
+    settings: {
+        theme: 'light'
+    }
+});
+
+const promisifyRequest = (request) => new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+});
+
+const promisifyTransaction = (tx) => new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+});
+
+const MONTHS_FORMAT = 'vitaltrack-months';
+
+// UTC month of a record, e.g. "2026-01"
+const monthOf = (record) => {
+    const t = record.timestamp;
+    if (typeof t === 'string' && t.length === 24 && t[4] === '-' && t.endsWith('Z')) return t.slice(0, 7);
+    return new Date(window.TimeIndex.timeOf(record)).toISOString().slice(0, 7);
+};
+
+// Records whose id repeats an earlier one's get a fresh id (old ids were
+// Date.now(), which bulk back-fills could repeat)
+const withUniqueIds = (records) => {
+    const seen = new Set();
+    return records.map(record => {
+        if (!seen.has(record.id)) {
+            seen.add(record.id);
+            return record;
+        }
+        const copy = { ...record, id: window.RecordIds.next() };
+        seen.add(copy.id);
+        return copy;
+    });
+};
+
+// Month -> { meals, symptoms }
+const groupByMonth = (data) => {
+    const months = new Map();
+    ['meals', 'symptoms'].forEach(kind => (data[kind] || []).forEach(record => {
+        const month = monthOf(record);
+        if (!months.has(month)) months.set(month, { meals: [], symptoms: [] });
+        months.get(month)[kind].push(record);
+    }));
+    return months;
+};
+
+// Saves the whole dataset under one key, as plain JSON or, with
+// `columnar`, in the much smaller Columnar encoding. Either is loaded.
+//
+// With `log`, a change is instead appended as one small operation under
+// its own `<key>_op_<sequence>` key, in the same { type, kind, records }
+// shape Store sends to other tabs. Loading replays the snapshot and then
+// the log; compact() folds the log into the snapshot and runs in idle time
+// once the log holds COMPACT_RECORDS records.
+//
+// With `partitioned`, the snapshot is split by UTC month: the main key
+// holds a small manifest ({ format, months: { "2026-01": counts },
+// settings }) and each month a columnar segment under `<key>_m_<month>`.
+// A change rewrites only the months its records fall in, so old months
+// stay untouched, and loadRange() reads only the months it overlaps.
+// Every layout is read whatever the options, and the next snapshot write
+// converts to the configured one.
+window.LocalStorageBackend = class LocalStorageBackend {
+    constructor(storageKey = 'vitaltrack_data', { columnar = false, log = false, partitioned = false } = {}) {
+        this.storageKey = storageKey;
+        this.columnar = columnar;
+        this.log = log;
+        this.partitioned = partitioned;
+        this.recordWrites = log || partitioned;
+        this.opPrefix = `${storageKey}_op_`;
+        this.monthPrefix = `${storageKey}_m_`;
+        this.recentKey = `${storageKey}_recent`;
+        this.loggedRecords = 0;
+        this.compactScheduled = false;
+        this.bytesWritten = 0;
+    }
+
+    async load() {
+        const data = this.replay(this.readSnapshot(), this.opKeys());
+        if (this.log && this.loggedRecords >= LocalStorageBackend.COMPACT_RECORDS) this.scheduleCompaction();
+        return data;
+    }
+
+    // Records with from <= time <= to (ms); a partitioned snapshot reads
+    // only the months in that range
+    async loadRange(from, to) {
+        const manifest = this.readManifest();
+        let data;
+        if (manifest) {
+            const first = new Date(Math.max(from, -8.64e15)).toISOString().slice(0, 7);
+            const last = new Date(Math.min(to, 8.64e15)).toISOString().slice(0, 7);
+            data = this.readMonths(manifest, Object.keys(manifest.months).filter(month => month >= first && month <= last));
+        } else {
+            data = this.readSnapshot();
+        }
+        const inRange = (record) => {
+            const time = window.TimeIndex.timeOf(record);
+            return time >= from && time <= to;
+        };
+        const replayed = this.replay(data, this.opKeys());
+        return {
+            meals: replayed.meals.filter(inRange),
+            symptoms: replayed.symptoms.filter(inRange),
+            settings: replayed.settings
+        };
+    }
+
+    async save(data, change) {
+        if (this.log && change) {
+            this.append({ type: 'records', kind: change.kind, records: change.records || [change.record] });
+        } else if (this.partitioned && change) {
+            this.mergeIntoMonths({ [change.kind]: change.records || [change.record] });
+        } else {
+            this.writeSnapshot(data, this.opKeys());
+        }
+    }
+
+    async loadRecent() {
+        const saved = localStorage.getItem(this.recentKey);
+        return saved ? JSON.parse(saved) : null;
+    }
+
+    async saveRecent(partition) {
+        this.setItem(this.recentKey, JSON.stringify(partition));
+    }
+
+    // Drops one month's segment (after folding in the log)
+    async deleteMonth(month) {
+        this.compact();
+        const manifest = this.readManifest();
+        if (!manifest) {
+            const data = this.readSnapshot();
+            const other = (record) => monthOf(record) !== month;
+            this.writeSnapshot({ meals: data.meals.filter(other), symptoms: data.symptoms.filter(other), settings: data.settings }, []);
+            return;
+        }
+        delete manifest.months[month];
+        this.setItem(this.storageKey, JSON.stringify(manifest));
+        localStorage.removeItem(this.monthPrefix + month);
+    }
+
+    // The clear is logged first, so an interrupted clear still replays as one
+    async clear() {
+        const keys = this.opKeys();
+        const clearKey = this.log ? this.append({ type: 'clear' }) : null;
+        const manifest = this.readManifest();
+        localStorage.removeItem(this.recentKey);
+        localStorage.removeItem(this.storageKey);
+        if (manifest) Object.keys(manifest.months).forEach(month => localStorage.removeItem(this.monthPrefix + month));
+        keys.forEach(key => localStorage.removeItem(key));
+        if (clearKey) localStorage.removeItem(clearKey);
+        this.loggedRecords = 0;
+    }
+
+    readSnapshot() {
+        const saved = localStorage.getItem(this.storageKey);
+        if (!saved) return emptyData();
+        const value = window.Columnar.parse(saved);
+        return value.format === MONTHS_FORMAT ? this.readMonths(value, Object.keys(value.months)) : value;
+    }
+
+    readManifest() {
+        const saved = localStorage.getItem(this.storageKey);
+        if (!saved || !saved.includes(MONTHS_FORMAT)) return null;
+        const value = JSON.parse(saved);
+        return value.format === MONTHS_FORMAT ? value : null;
+    }
+
+    readMonths(manifest, months) {
+        const data = { meals: [], symptoms: [], settings: manifest.settings };
+        months.sort().forEach(month => {
+            const segment = this.readSegment(month);
+            data.meals.push(...segment.meals);
+            data.symptoms.push(...segment.symptoms);
+        });
+        return data;
+    }
+
+    readSegment(month) {
+        const saved = localStorage.getItem(this.monthPrefix + month);
+        return saved ? window.Columnar.parse(saved) : { meals: [], symptoms: [] };
+    }
+
+    // Writes `data` as the snapshot and drops the operations it includes
+    writeSnapshot(data, folded) {
+        if (this.partitioned) {
+            const old = this.readManifest();
+            const months = groupByMonth(data);
+            this.writeMonths(months, { format: MONTHS_FORMAT, version: 1, months: {}, settings: data.settings });
+            if (old) {
+                Object.keys(old.months).filter(month => !months.has(month))
+                    .forEach(month => localStorage.removeItem(this.monthPrefix + month));
+            }
+        } else {
+            const text = this.columnar ? window.Columnar.stringify(window.Columnar.encode(data)) : JSON.stringify(data);
+            const old = this.readManifest();
+            this.setItem(this.storageKey, text);
+            if (old) Object.keys(old.months).forEach(month => localStorage.removeItem(this.monthPrefix + month));
+        }
+        folded.forEach(key => localStorage.removeItem(key));
+        this.loggedRecords = 0;
+    }
+
+    // Writes the given month segments, then the manifest that lists them
+    writeMonths(months, manifest) {
+        months.forEach((segment, month) => {
+            const encoded = window.Columnar.encode({ meals: segment.meals, symptoms: segment.symptoms, settings: null });
+            this.setItem(this.monthPrefix + month, window.Columnar.stringify(encoded));
+            manifest.months[month] = { meals: segment.meals.length, symptoms: segment.symptoms.length };
+        });
+        this.setItem(this.storageKey, JSON.stringify(manifest));
+    }
+
+    // Upserts records (by id) into just the month segments they fall in
+    mergeIntoMonths(records) {
+        let manifest = this.readManifest();
+        if (!manifest) {
+            // First write in this layout converts the whole snapshot
+            this.writeSnapshot(this.readSnapshot(), []);
+            manifest = this.readManifest();
+        }
+        const months = new Map();
+        groupByMonth(records).forEach((added, month) => {
+            const segment = this.readSegment(month);
+            const merged = {};
+            ['meals', 'symptoms'].forEach(kind => {
+                const byId = new Map(segment[kind].map(r => [r.id, r]));
+                added[kind].forEach(record => byId.set(record.id, record));
+                merged[kind] = [...byId.values()];
+            });
+            months.set(month, merged);
+        });
+        this.writeMonths(months, manifest);
+    }
+
+    // Log keys in the order they were written
+    opKeys() {
+        const keys = [];
+        for (let i = 0; i < localStorage.length; i++) {
+            const key = localStorage.key(i);
+            if (key.startsWith(this.opPrefix)) keys.push(key);
+        }
+        return keys.sort();
+    }
+
+    // Applies logged operations to a snapshot; records are upserted by id
+    replay(data, keys) {
+        this.loggedRecords = 0;
+        if (keys.length === 0) return data;
+        const byId = {
+            meals: new Map((data.meals || []).map(r => [r.id, r])),
+            symptoms: new Map((data.symptoms || []).map(r => [r.id, r]))
+        };
+        this.readOps(keys).forEach(op => {
+            if (op.type === 'clear') {
+                byId.meals.clear();
+                byId.symptoms.clear();
+            } else {
+                op.records.forEach(record => byId[op.kind].set(record.id, record));
+                this.loggedRecords += op.records.length;
+            }
+        });
+        return { meals: [...byId.meals.values()], symptoms: [...byId.symptoms.values()], settings: data.settings };
+    }
+
+    // localStorage keeps strings as UTF-16, two bytes per code unit
+    setItem(key, value) {
+        localStorage.setItem(key, value);
+        this.bytesWritten += value.length * 2;
+    }
+
+    readOps(keys) {
+        return keys.map(key => JSON.parse(localStorage.getItem(key)));
+    }
+
+    // Returns the operation's key. A full quota is met by compacting the
+    // log (the snapshot encoding is much smaller) and trying once more.
+    append(op) {
+        // Fixed-width sequence numbers sort as text
+        const key = this.opPrefix + String(window.RecordIds.next()).padStart(17, '0');
+        const text = JSON.stringify(op);
+        try {
+            this.setItem(key, text);
+        } catch (error) {
+            this.compact();
+            this.setItem(key, text);
+        }
+        this.loggedRecords += op.records ? op.records.length : 0;
+        if (this.loggedRecords >= LocalStorageBackend.COMPACT_RECORDS) this.scheduleCompaction();
+        return key;
+    }
+
+    scheduleCompaction() {
+        if (this.compactScheduled) return;
+        this.compactScheduled = true;
+        const run = () => {
+            this.compactScheduled = false;
+            this.compact();
+        };
+        if (typeof requestIdleCallback === 'function') requestIdleCallback(run, { timeout: 5000 });
+        else setTimeout(run, 0);
+    }
+
+    // Folds the stored log, including other tabs' operations, into the
+    // snapshot; a partitioned snapshot only rewrites the months it touches
+    compact() {
+        const keys = this.opKeys();
+        if (keys.length === 0) return;
+        const ops = this.readOps(keys);
+        if (this.partitioned && this.readManifest() && ops.every(op => op.type === 'records')) {
+            const records = { meals: [], symptoms: [] };
+            ops.forEach(op => records[op.kind].push(...op.records));
+            this.mergeIntoMonths(records);
+            keys.forEach(key => localStorage.removeItem(key));
+            this.loggedRecords = 0;
+        } else {
+            this.writeSnapshot(this.replay(this.readSnapshot(), keys), keys);
+        }
+    }
+};
+
+window.LocalStorageBackend.COMPACT_RECORDS = 200;
+
+window.IndexedDBBackend = class IndexedDBBackend {
+    constructor({ dbName = 'vitaltrack', legacyKey = 'vitaltrack_data' } = {}) {
+        this.dbName = dbName;
+        this.legacyKey = legacyKey;
+        this.version = 1;
+        this.db = null;
+        this.recordWrites = true;
+        this.bytesWritten = 0;
+    }
+
+    static isSupported() {
+        return typeof indexedDB !== 'undefined';
+    }
+
+    open() {
+        if (!this.db) {
+            const request = indexedDB.open(this.dbName, this.version);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                ['meals', 'symptoms'].forEach(name => {
+                    if (!db.objectStoreNames.contains(name)) {
+                        db.createObjectStore(name, { keyPath: 'id' });
+                    }
+                });
+                if (!db.objectStoreNames.contains('meta')) {
+                    db.createObjectStore('meta', { keyPath: 'key' });
+                }
+            };
+            this.db = promisifyRequest(request).then(db => {
+                // Let other tabs upgrade or delete the database
+                db.onversionchange = () => db.close();
+                return db;
+            });
+        }
+        return this.db;
+    }
+
+    async load() {
+        const db = await this.open();
+        await this.migrateLegacy(db);
+
+        const tx = db.transaction(['meals', 'symptoms', 'meta'], 'readonly');
+        const [meals, symptoms, settings] = await Promise.all([
+            promisifyRequest(tx.objectStore('meals').getAll()),
+            promisifyRequest(tx.objectStore('symptoms').getAll()),
+            promisifyRequest(tx.objectStore('meta').get('settings'))
+        ]);
+
+        // Object stores iterate by id, the old array kept insertion order
+        const byTime = (a, b) => new Date(a.timestamp) - new Date(b.timestamp);
+        return {
+            meals: meals.sort(byTime),
+            symptoms: symptoms.sort(byTime),
+            settings: settings ? settings.value : emptyData().settings
+        };
+    }
+
+    // Moves a pre-IndexedDB localStorage snapshot, and any operation log a
+    // localStorage fallback appended to it, into the object stores once.
+    // Repeated ids are renumbered so no record overwrites another, and the
+    // source is only removed once every record is found in the stores;
+    // otherwise this throws and the source stays for the next attempt.
+    async migrateLegacy(db) {
+        const legacyStore = new window.LocalStorageBackend(this.legacyKey);
+        if (localStorage.getItem(this.legacyKey) === null && legacyStore.opKeys().length === 0) return;
+
+        const legacy = await legacyStore.load();
+        const data = {
+            meals: withUniqueIds(legacy.meals || []),
+            symptoms: withUniqueIds(legacy.symptoms || []),
+            settings: legacy.settings || emptyData().settings
+        };
+        await this.writeAll(db, data, false);
+
+        const tx = db.transaction(['meals', 'symptoms'], 'readonly');
+        const [mealKeys, symptomKeys] = await Promise.all([
+            promisifyRequest(tx.objectStore('meals').getAllKeys()),
+            promisifyRequest(tx.objectStore('symptoms').getAllKeys())
+        ]);
+        const missing = (records, keys) => {
+            const stored = new Set(keys);
+            return records.filter(record => !stored.has(record.id)).length;
+        };
+        const lost = missing(data.meals, mealKeys) + missing(data.symptoms, symptomKeys);
+        if (lost > 0) throw new Error(`Migration to IndexedDB left out ${lost} records; keeping the localStorage copy`);
+
+        await legacyStore.clear();
+        const renumbered = data.meals.filter((r, i) => r !== legacy.meals[i]).length
+            + data.symptoms.filter((r, i) => r !== legacy.symptoms[i]).length;
+        console.log(`Migrated ${data.meals.length} meals and ${data.symptoms.length} symptoms to IndexedDB`
+            + (renumbered ? ` (${renumbered} with repeated ids renumbered)` : ''));
+    }
+
+    // Null while a legacy snapshot still waits to be migrated by load()
+    async loadRecent() {
+        const db = await this.open();
+        const legacyStore = new window.LocalStorageBackend(this.legacyKey);
+        if (localStorage.getItem(this.legacyKey) !== null || legacyStore.opKeys().length > 0) return null;
+        const tx = db.transaction('meta', 'readonly');
+        const recent = await promisifyRequest(tx.objectStore('meta').get('recent'));
+        return recent ? recent.value : null;
+    }
+
+    async saveRecent(partition) {
+        const db = await this.open();
+        const tx = db.transaction('meta', 'readwrite');
+        this.put(tx.objectStore('meta'), { key: 'recent', value: partition });
+        return promisifyTransaction(tx);
+    }
+
+    async save(data, change) {
+        const db = await this.open();
+        if (change) {
+            const tx = db.transaction(change.kind, 'readwrite');
+            const store = tx.objectStore(change.kind);
+            (change.records || [change.record]).forEach(record => this.put(store, record));
+            return promisifyTransaction(tx);
+        }
+        return this.writeAll(db, data, true);
+    }
+
+    // `removed` lists the records Store dropped for that month
+    async deleteMonth(month, removed) {
+        const db = await this.open();
+        const tx = db.transaction(['meals', 'symptoms'], 'readwrite');
+        ['meals', 'symptoms'].forEach(kind => removed[kind].forEach(record => tx.objectStore(kind).delete(record.id)));
+        return promisifyTransaction(tx);
+    }
+
+    writeAll(db, data, replace) {
+        const tx = db.transaction(['meals', 'symptoms', 'meta'], 'readwrite');
+        ['meals', 'symptoms'].forEach(kind => {
+            const store = tx.objectStore(kind);
+            if (replace) store.clear();
+            data[kind].forEach(record => this.put(store, record));
+        });
+        this.put(tx.objectStore('meta'), { key: 'settings', value: data.settings });
+        return promisifyTransaction(tx);
+    }
+
+    // Structured clones have no cheap size, so two bytes per JSON character
+    // stands in for it
+    put(store, value) {
+        store.put(value);
+        this.bytesWritten += JSON.stringify(value).length * 2;
+    }
+
+    async clear() {
+        const db = await this.open();
+        const tx = db.transaction(['meals', 'symptoms', 'meta'], 'readwrite');
+        ['meals', 'symptoms', 'meta'].forEach(name => tx.objectStore(name).clear());
+        new window.LocalStorageBackend(this.legacyKey).clear();
+        return promisifyTransaction(tx);
+    }
+};
+
+window.createStorageBackend = (storageKey) => {
+    if (window.IndexedDBBackend.isSupported()) {
+        return new window.IndexedDBBackend({ legacyKey: storageKey });
+    }
+    return new window.LocalStorageBackend(storageKey, { columnar: true, log: true, partitioned: true });
+};
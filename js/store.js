@@ -1,99 +1,625 @@
 // js/store.js
 
+const whenIdle = () => new Promise(resolve => {
+    if (typeof requestIdleCallback === 'function') requestIdleCallback(resolve, { timeout: 2000 });
+    else setTimeout(resolve, 200);
+});
+
 window.Store = class Store {
-    constructor() {
+    constructor(options = {}) {
         this.storageKey = 'vitaltrack_data';
-        this.data = this.load();
-    }
-
-    load() {
-        const saved = localStorage.getItem(this.storageKey);
-        return saved ? JSON.parse(saved) : {
+        this.backend = options.backend || window.createStorageBackend(this.storageKey);
+        this.data = {
             meals: [],
             symptoms: [],
             settings: {
                 theme: 'light'
             }
         };
+        // Bumped on every change to the records, never reset
+        this.revision = 0;
+        this.memo = new window.MemoCache(32);
+        // Timings of loads, writes and derived reads, records scanned by
+        // queries and bytes the backend wrote (see Metrics)
+        this.metrics = options.metrics || new window.Metrics();
+        this.bytesCounted = 0;
+        this.listeners = new Set();
+        // Write-behind queue: changes are coalesced and persisted together
+        // `flushDelay` ms later, during idle time
+        this.flushDelay = options.flushDelay ?? 250;
+        this.queued = null;
+        this.cancelScheduledFlush = null;
+        this.writing = Promise.resolve();
+        this.lastWriteAt = 0;
+        // Other tabs' changes arrive as messages (see applyRemote)
+        this.sync = options.sync || null;
+        if (this.sync) this.sync.onMessage(message => this.applyRemote(message));
+        this.buildIndexes();
+
+        // `recent` resolves once the dashboard can render and `ready` once
+        // the whole history is in memory. A lazy store first loads the
+        // backend's recent partition and hydrates the rest when idle or
+        // when hydrate() asks for it, then emits { kind: 'all' }.
+        this.lazy = Boolean(options.lazy);
+        this.hydrated = false;
+        // Total record counts carried by the recent partition until hydrated
+        this.counts = null;
+        if (this.lazy) {
+            const requested = new Promise(resolve => (this.requestHydration = resolve));
+            this.recent = this.loadRecent();
+            this.ready = this.recent.then(() => this.hydrated || Promise.race([requested, whenIdle()])
+                .then(() => this.load())
+                .then(() => this.emit({ kind: 'all' })));
+        } else {
+            this.requestHydration = () => {};
+            this.ready = this.load();
+            this.recent = this.ready;
+        }
+
+        if (typeof document !== 'undefined') {
+            document.addEventListener('visibilitychange', () => {
+                if (document.visibilityState === 'hidden') this.flush().catch(() => {});
+            });
+            window.addEventListener('pagehide', () => this.flush().catch(() => {}));
+        }
+    }
+
+    async load() {
+        let saved;
+        try {
+            saved = await this.metrics.time('store.load', () => this.backend.load());
+        } catch (error) {
+            console.error('Storage backend failed to load, falling back to localStorage:', error);
+            this.backend = new window.LocalStorageBackend(this.storageKey, { columnar: true, log: true, partitioned: true });
+            saved = await this.backend.load();
+        }
+
+        // Keep anything logged while the backend was still loading; records
+        // from the recent partition are in `saved` already
+        const unsaved = (kind) => {
+            const ids = new Set(saved[kind].map(r => r.id));
+            return this.data[kind].filter(r => !ids.has(r.id));
+        };
+        this.data = {
+            meals: [...saved.meals, ...unsaved('meals')],
+            symptoms: [...saved.symptoms, ...unsaved('symptoms')],
+            settings: saved.settings || this.data.settings
+        };
+        this.counts = null;
+        this.hydrated = true;
+        this.buildIndexes();
+    }
+
+    // Loads the backend's recent partition (see recentPartition), or
+    // everything when there is none yet
+    async loadRecent() {
+        let partition = null;
+        try {
+            if (this.backend.loadRecent) partition = await this.metrics.time('store.loadRecent', () => this.backend.loadRecent());
+        } catch (error) {
+            console.error('Recent partition failed to load:', error);
+        }
+        if (!partition) {
+            await this.load();
+            return;
+        }
+
+        this.data = {
+            meals: partition.meals,
+            symptoms: partition.symptoms,
+            settings: partition.settings || this.data.settings
+        };
+        this.counts = { ...partition.counts };
+        this.buildIndexes();
     }
 
-    save() {
-        localStorage.setItem(this.storageKey, JSON.stringify(this.data));
+    // Starts hydrating now rather than when idle; resolves when done
+    hydrate() {
+        this.requestHydration();
+        return this.ready;
+    }
+
+    // Records from the last RECENT_DAYS days plus the newest
+    // RECENT_MIN_RECORDS of each type: enough for today's counts and the
+    // recent activity list. Every record newer than a partition's `since`
+    // is in it, so a store holding only that partition can still make the
+    // next one.
+    recentPartition(now = Date.now()) {
+        const since = now - Store.RECENT_DAYS * 24 * 60 * 60 * 1000;
+        const pick = (index) => {
+            const start = Math.min(index.lowerBound(since), Math.max(0, index.length - Store.RECENT_MIN_RECORDS));
+            return index.records.slice(start);
+        };
+        return {
+            since: new Date(since).toISOString(),
+            meals: pick(this.indexes.meals),
+            symptoms: pick(this.indexes.symptoms),
+            settings: this.data.settings,
+            counts: this.getTotals()
+        };
+    }
+
+    getTotals() {
+        return this.counts ? { ...this.counts } : { meals: this.data.meals.length, symptoms: this.data.symptoms.length };
+    }
+
+    // Sorts the records once and keeps them sorted: data.meals and
+    // data.symptoms are the index arrays themselves, not copies
+    buildIndexes() {
+        this.indexes = {
+            meals: new window.TimeIndex(this.data.meals),
+            symptoms: new window.TimeIndex(this.data.symptoms)
+        };
+        this.data.meals = this.indexes.meals.records;
+        this.data.symptoms = this.indexes.symptoms.records;
+        this.data.meals.forEach(m => window.RecordIds.observe(m.id));
+        this.data.symptoms.forEach(s => window.RecordIds.observe(s.id));
+
+        // Ingredients and meal triggers are normalized and interned once
+        // here and on insert, never per query
+        this.ingredients = new window.IngredientIndex();
+        this.triggerNames = [];
+        this.triggerIds = new Map();
+        this.mealTriggers = new WeakMap();
+        this.data.meals.forEach(m => this.mealTriggers.set(m, this.internTriggers(m)));
+
+        // symptom -> trigger id -> occurrences; built by buildMatrix() or
+        // installMatrix(), then kept current by every insert
+        this.matrix = null;
+        this.revision++;
+
+        const byName = {};
+        this.data.symptoms.forEach(s => (byName[s.symptom] = byName[s.symptom] || []).push(s));
+        this.symptomIndexes = new Map(Object.entries(byName).map(([name, records]) => [name, new window.TimeIndex(records)]));
+        this.rollups = new window.DailyRollups(this.data.symptoms);
+    }
+
+    // Meal name + "Ingredient: x" trigger ids, using the dictionary's
+    // spelling of each ingredient
+    internTriggers(meal) {
+        const ingredients = this.ingredients.add(meal).map(id => `Ingredient: ${this.ingredients.names[id]}`);
+        return [...new Set([meal.name, ...ingredients])].map(trigger => {
+            if (!this.triggerIds.has(trigger)) {
+                this.triggerIds.set(trigger, this.triggerNames.length);
+                this.triggerNames.push(trigger);
+            }
+            return this.triggerIds.get(trigger);
+        });
+    }
+
+    indexMeal(record) {
+        const triggers = this.internTriggers(record);
+
+        if (this.matrix) {
+            // Occurrences 1-12 hours after this meal gain the triggers they had not seen yet
+            const HOUR = window.CorrelationEngine.HOUR;
+            const time = window.TimeIndex.timeOf(record);
+            const symptoms = this.indexes.symptoms;
+            for (let i = symptoms.lowerBound(time + HOUR), end = symptoms.upperBound(time + 12 * HOUR); i < end; i++) {
+                const seen = this.triggersBefore(symptoms.times[i]);
+                const row = this.matrixRow(symptoms.records[i].symptom);
+                triggers.forEach(t => {
+                    if (!seen.has(t)) row.set(t, (row.get(t) || 0) + 1);
+                });
+            }
+        }
+
+        this.indexes.meals.insert(record);
+        this.mealTriggers.set(record, triggers);
+        if (this.counts) this.counts.meals++;
+        this.revision++;
+    }
+
+    indexSymptom(record) {
+        this.indexes.symptoms.insert(record);
+        if (!this.symptomIndexes.has(record.symptom)) {
+            this.symptomIndexes.set(record.symptom, new window.TimeIndex());
+        }
+        this.symptomIndexes.get(record.symptom).insert(record);
+        this.rollups.add(record);
+
+        if (this.matrix) {
+            const row = this.matrixRow(record.symptom);
+            this.triggersBefore(window.TimeIndex.timeOf(record)).forEach(t => row.set(t, (row.get(t) || 0) + 1));
+        }
+        if (this.counts) this.counts.symptoms++;
+        this.revision++;
+    }
+
+    // Trigger ids of the meals 1-12 hours before `time`
+    triggersBefore(time) {
+        const HOUR = window.CorrelationEngine.HOUR;
+        const meals = this.indexes.meals;
+        const triggers = new Set();
+        for (let i = meals.lowerBound(time - 12 * HOUR), end = meals.upperBound(time - HOUR); i < end; i++) {
+            this.mealTriggers.get(meals.records[i]).forEach(t => triggers.add(t));
+        }
+        return triggers;
+    }
+
+    matrixRow(symptomName) {
+        if (!this.matrix.has(symptomName)) this.matrix.set(symptomName, new Map());
+        return this.matrix.get(symptomName);
+    }
+
+    // Calls listener({ kind, record }) after every insert, or
+    // listener({ kind: 'all' }) when the whole dataset was replaced
+    onChange(listener) {
+        this.listeners.add(listener);
+        return () => this.listeners.delete(listener);
+    }
+
+    emit(change) {
+        this.listeners.forEach(listener => listener(change));
+    }
+
+    // Queues a change ({ kind, record } or { kind, records }; none means
+    // everything) for the next flush and resolves once it is persisted
+    save(change) {
+        if (!this.queued) {
+            const batch = { all: false, meals: new Map(), symptoms: new Map() };
+            batch.done = new Promise((resolve, reject) => {
+                batch.resolve = resolve;
+                batch.reject = reject;
+            });
+            this.queued = batch;
+        }
+        const batch = this.queued;
+        if (change) {
+            (change.records || [change.record]).forEach(record => batch[change.kind].set(record.id, record));
+        } else {
+            batch.all = true;
+        }
+        this.scheduleFlush();
+        return batch.done;
+    }
+
+    scheduleFlush() {
+        if (this.cancelScheduledFlush) return;
+        let idle = null;
+        const timer = setTimeout(() => {
+            if (typeof requestIdleCallback === 'function') {
+                idle = requestIdleCallback(() => this.flush().catch(() => {}), { timeout: 1000 });
+            } else {
+                this.flush().catch(() => {});
+            }
+        }, this.flushDelay);
+        this.cancelScheduledFlush = () => {
+            clearTimeout(timer);
+            if (idle !== null) cancelIdleCallback(idle);
+        };
+    }
+
+    // Writes everything queued so far, one write per record type (or one
+    // snapshot for backends without record writes). Resolves when all
+    // earlier flushes are done too.
+    flush() {
+        if (this.cancelScheduledFlush) {
+            this.cancelScheduledFlush();
+            this.cancelScheduledFlush = null;
+        }
+        const batch = this.queued;
+        this.queued = null;
+        if (batch) {
+            this.writing = this.writing.catch(() => {}).then(() => this.metrics.time('store.save', () => this.writeBatch(batch)));
+            this.writing.then(batch.resolve, batch.reject);
+        }
+        return this.writing;
+    }
+
+    // Record-level writes need only the recent partition in memory, whole
+    // snapshots need the full history
+    async writeBatch(batch) {
+        await (batch.all || !this.backend.recordWrites ? this.ready : this.recent);
+        const time = Date.now();
+        this.lastWriteAt = time;
+        if (batch.all || !this.backend.recordWrites) {
+            await this.backend.save(this.data);
+        } else {
+            for (const kind of ['meals', 'symptoms']) {
+                if (batch[kind].size > 0) {
+                    await this.backend.save(this.data, { kind, records: [...batch[kind].values()] });
+                }
+            }
+        }
+        if (this.backend.saveRecent) await this.backend.saveRecent(this.recentPartition());
+        this.countPersisted();
+
+        if (batch.all) {
+            this.broadcast({ type: 'reload', time });
+        } else {
+            ['meals', 'symptoms'].forEach(kind => {
+                if (batch[kind].size > 0) this.broadcastRecords(kind, [...batch[kind].values()], time);
+            });
+        }
+    }
+
+    // Backends that track it report the bytes they wrote so far
+    countPersisted() {
+        const total = this.backend.bytesWritten || 0;
+        if (total > this.bytesCounted) this.metrics.count('bytes.persisted', total - this.bytesCounted);
+        this.bytesCounted = total;
+    }
+
+    // Queued changes are dropped, not written
+    clear() {
+        if (this.queued) {
+            this.queued.resolve();
+            this.queued = null;
+        }
+        if (this.cancelScheduledFlush) {
+            this.cancelScheduledFlush();
+            this.cancelScheduledFlush = null;
+        }
+        this.writing = this.writing.catch(() => {})
+            .then(() => this.ready)
+            .then(() => this.backend.clear())
+            .then(() => this.broadcast({ type: 'reload', time: Date.now() }));
+        return this.writing;
+    }
+
+    broadcast(message) {
+        if (this.sync) this.sync.post(message);
+    }
+
+    // Large batches (imports) are cheaper to re-read than to send
+    broadcastRecords(kind, records, time) {
+        if (records.length > Store.SYNC_LIMIT) this.broadcast({ type: 'reload', time });
+        else this.broadcast({ type: 'records', kind, records, time });
+    }
+
+    // Applies another tab's persisted change: new records go through the
+    // same incremental indexing as local inserts; records that replace
+    // existing ones, and 'reload' messages, rebuild from the backend's data
+    async applyRemote(message) {
+        await this.ready;
+        if (message.type === 'reload') {
+            await this.reload();
+            return;
+        }
+
+        const { kind, records, time } = message;
+        const byId = new Map(this.data[kind].map(r => [r.id, r]));
+        const fresh = [];
+        const replaced = new Map();
+        records.forEach(record => {
+            window.RecordIds.observeRemote(record.id);
+            const existing = byId.get(record.id);
+            if (!existing) fresh.push(record);
+            else if (JSON.stringify(existing) !== JSON.stringify(record)) replaced.set(record.id, record);
+        });
+
+        if (replaced.size > 0) {
+            this.data[kind] = [...this.data[kind].map(r => replaced.get(r.id) || r), ...fresh];
+            this.buildIndexes();
+            this.emit({ kind: 'all' });
+        } else if (fresh.length > 0) {
+            fresh.forEach(record => (kind === 'meals' ? this.indexMeal(record) : this.indexSymptom(record)));
+            if (fresh.length > Store.SYNC_EMIT_LIMIT) this.emit({ kind: 'all' });
+            else fresh.forEach(record => this.emit({ kind, record }));
+        }
+
+        // A snapshot this tab wrote after the other tab's write dropped
+        // its records; write them back
+        if (!this.backend.recordWrites && this.lastWriteAt >= time && (fresh.length > 0 || replaced.size > 0)) {
+            this.save();
+        }
+    }
+
+    // Deletes one UTC calendar month ("2026-01") of records and resolves
+    // with how many of each type went. Partitioned storage drops that
+    // month's segment without touching the others.
+    async deleteMonth(month) {
+        await this.hydrate();
+        await this.flush();
+        const [year, monthNumber] = month.split('-').map(Number);
+        const from = Date.UTC(year, monthNumber - 1, 1);
+        const to = Date.UTC(year, monthNumber, 1) - 1;
+
+        const removed = {};
+        ['meals', 'symptoms'].forEach(kind => {
+            const index = this.indexes[kind];
+            const lo = index.lowerBound(from);
+            const hi = index.upperBound(to);
+            removed[kind] = index.records.slice(lo, hi);
+            this.data[kind] = [...index.records.slice(0, lo), ...index.records.slice(hi)];
+        });
+        this.buildIndexes();
+        this.emit({ kind: 'all' });
+
+        this.writing = this.writing.catch(() => {}).then(async () => {
+            if (this.backend.deleteMonth) await this.backend.deleteMonth(month, removed);
+            else await this.backend.save(this.data);
+            if (this.backend.saveRecent) await this.backend.saveRecent(this.recentPartition());
+            this.countPersisted();
+            this.broadcast({ type: 'reload', time: Date.now() });
+        });
+        await this.writing;
+        return { meals: removed.meals.length, symptoms: removed.symptoms.length };
+    }
+
+    // Replaces the in-memory data with the backend's, after writing
+    // anything still queued
+    async reload() {
+        await this.flush();
+        const saved = await this.backend.load();
+        this.data = {
+            meals: saved.meals,
+            symptoms: saved.symptoms,
+            settings: saved.settings || this.data.settings
+        };
+        this.buildIndexes();
+        this.emit({ kind: 'all' });
     }
 
     addMeal(meal) {
-        this.data.meals.push({
-            id: Date.now(),
+        const record = {
+            id: window.RecordIds.next(),
             timestamp: new Date().toISOString(),
             ...meal
-        });
-        this.save();
+        };
+        this.indexMeal(record);
+        this.emit({ kind: 'meals', record });
+        return this.save({ kind: 'meals', record });
     }
 
     addSymptom(symptom) {
-        this.data.symptoms.push({
-            id: Date.now(),
+        const record = {
+            id: window.RecordIds.next(),
             timestamp: new Date().toISOString(),
             ...symptom
+        };
+        this.indexSymptom(record);
+        this.emit({ kind: 'symptoms', record });
+        return this.save({ kind: 'symptoms', record });
+    }
+
+    // Lazy, index-backed query over one record type (see RecordQuery).
+    // `symptom` reads that symptom's own index and from/to (ms, ISO string
+    // or Date) are binary searches; severity and ingredient are checked per
+    // record. An `ingredient` that names a known ingredient reads its meal
+    // index; any other text matches meals whose ingredients contain it. A
+    // query keeps the index it was made on, so one made before an import
+    // keeps reading the old records.
+    query({ type = 'symptoms', symptom, from, to, minSeverity, maxSeverity, ingredient, order, offset, limit, cursor } = {}) {
+        let index = type === 'meals' ? this.indexes.meals : this.indexes.symptoms;
+        if (type === 'symptoms' && symptom !== undefined) {
+            index = this.symptomIndexes.get(symptom) || new window.TimeIndex();
+        }
+
+        const checks = [];
+        if (minSeverity !== undefined) checks.push(r => Number(r.severity) >= minSeverity);
+        if (maxSeverity !== undefined) checks.push(r => Number(r.severity) <= maxSeverity);
+        if (ingredient && type === 'meals' && this.ingredients.mealsWith(ingredient)) {
+            index = this.ingredients.mealsWith(ingredient);
+        } else if (ingredient) {
+            const needle = ingredient.toLowerCase();
+            checks.push(r => (r.ingredients || '').toLowerCase().includes(needle));
+        }
+
+        return new window.RecordQuery(index, {
+            from: from === undefined ? -Infinity : new Date(from).getTime(),
+            to: to === undefined ? Infinity : new Date(to).getTime(),
+            filter: checks.length ? (r => checks.every(check => check(r))) : null,
+            order,
+            offset,
+            limit,
+            cursor,
+            metrics: this.metrics
         });
-        this.save();
+    }
+
+    // Most recent meal containing `ingredient`, or null
+    lastEaten(ingredient) {
+        const meals = this.ingredients.mealsWith(ingredient);
+        return meals && meals.length ? meals.records[meals.length - 1] : null;
+    }
+
+    suggestIngredients(prefix, limit = 8) {
+        return this.ingredients.suggest(prefix, limit);
+    }
+
+    // Derived results are cached until the next revision. Callers share the
+    // returned objects and must not mutate them. Computing one is timed as
+    // "store.<key up to the first colon>".
+    memoize(key, compute) {
+        return this.memo.get(this.revision, key, () => this.metrics.time(`store.${key.split(':')[0]}`, compute));
     }
 
     getStats() {
-        const today = new Date().toLocaleDateString();
-        const mealsToday = this.data.meals.filter(m => new Date(m.timestamp).toLocaleDateString() === today).length;
-        const symptomsToday = this.data.symptoms.filter(s => new Date(s.timestamp).toLocaleDateString() === today).length;
-        return { mealsToday, symptomsToday };
+        const today = window.TimeIndex.dayKey(Date.now());
+        return this.memoize(`stats:${today}`, () => ({
+            mealsToday: this.indexes.meals.onDay(today).length,
+            symptomsToday: this.indexes.symptoms.onDay(today).length
+        }));
     }
 
     getRecent(limit = 5) {
-        const all = [
-            ...this.data.meals.map(m => ({ ...m, type: 'meal' })),
-            ...this.data.symptoms.map(s => ({ ...s, type: 'symptom' }))
-        ];
-        return all.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp)).slice(0, limit);
+        return this.memoize(`recent:${limit}`, () => {
+            // Merge the newest ends of both sorted indexes
+            const { meals, symptoms } = this.indexes;
+            const recent = [];
+            let i = meals.length - 1;
+            let j = symptoms.length - 1;
+            while (recent.length < limit && (i >= 0 || j >= 0)) {
+                if (j < 0 || (i >= 0 && meals.times[i] >= symptoms.times[j])) {
+                    recent.push({ ...meals.records[i--], type: 'meal' });
+                } else {
+                    recent.push({ ...symptoms.records[j--], type: 'symptom' });
+                }
+            }
+            return recent;
+        });
     }
 
-    getTrendsData(days = 7) {
-        const labels = [];
-        const datasets = {}; // { symptomName: [countPerDay] }
-        const now = new Date();
-
-        // Initialize last X days
-        for (let i = days - 1; i >= 0; i--) {
-            const d = new Date(now);
-            d.setDate(d.getDate() - i);
-            labels.push(d.toLocaleDateString([], { month: 'short', day: 'numeric' }));
-        }
+    getSymptomNames() {
+        return this.memoize('symptomNames', () => [...this.symptomIndexes.keys()]);
+    }
 
-        // Get all unique symptoms
-        const uniqueSymptoms = [...new Set(this.data.symptoms.map(s => s.symptom))];
+    // Symptom counts for the last `range` days (or 'all') read from the
+    // daily rollups. Ranges up to 90 days get one bar per day, up to two
+    // years one per week (from Monday), longer ones one per month, so the
+    // chart never has more than ~100 bars.
+    getTrendsData(range = 7) {
+        const today = window.TimeIndex.dayKey(Date.now());
+        return this.memoize(`trends:${range}:${today}`, () => this.computeTrendsData(range));
+    }
 
-        uniqueSymptoms.forEach(sName => {
-            datasets[sName] = new Array(days).fill(0);
-        });
+    computeTrendsData(range) {
+        const end = new Date();
+        end.setHours(0, 0, 0, 0);
+        let start = new Date(end);
+        if (range === 'all') {
+            if (this.rollups.firstDay) {
+                const [y, m, d] = this.rollups.firstDay.split('-').map(Number);
+                start = new Date(y, m - 1, d);
+            }
+        } else {
+            start.setDate(start.getDate() - (range - 1));
+        }
 
-        // Populate counts
-        this.data.symptoms.forEach(s => {
-            const sDate = new Date(s.timestamp);
-            const diffTime = Math.abs(now - sDate);
-            const diffDays = Math.floor(diffTime / (1000 * 60 * 60 * 24));
+        // Round: days across a DST change are 23 or 25 hours long
+        const span = Math.round((end - start) / (24 * 60 * 60 * 1000)) + 1;
+        const unit = span <= 90 ? 'day' : span <= 730 ? 'week' : 'month';
+        const labelFormat = unit === 'month' ? { month: 'short', year: 'numeric' } : { month: 'short', day: 'numeric' };
 
-            if (diffDays < days) {
-                const index = (days - 1) - diffDays;
-                if (datasets[s.symptom]) {
-                    datasets[s.symptom][index]++;
-                }
+        const names = this.getSymptomNames();
+        const buckets = []; // one Map of symptom -> totals per bar
+        const labels = [];
+        for (const day = new Date(start); day <= end; day.setDate(day.getDate() + 1)) {
+            const opens = buckets.length === 0 || unit === 'day' ||
+                (unit === 'week' && day.getDay() === 1) ||
+                (unit === 'month' && day.getDate() === 1);
+            if (opens) {
+                buckets.push(new Map());
+                labels.push(day.toLocaleDateString([], labelFormat));
             }
-        });
+
+            const row = this.rollups.get(window.TimeIndex.dayKey(day));
+            if (!row) continue;
+            const bucket = buckets[buckets.length - 1];
+            row.forEach((entry, name) => {
+                const total = bucket.get(name) || { count: 0, severitySum: 0, maxSeverity: 0 };
+                total.count += entry.count;
+                total.severitySum += entry.severitySum;
+                total.maxSeverity = Math.max(total.maxSeverity, entry.maxSeverity);
+                bucket.set(name, total);
+            });
+        }
 
         return {
             labels,
-            datasets: Object.keys(datasets).map(name => ({
-                label: name.charAt(0).toUpperCase() + name.slice(1),
-                data: datasets[name],
-                backgroundColor: this.getColorForSymptom(name)
-            }))
+            unit,
+            datasets: names.map(name => {
+                const totals = buckets.map(bucket => bucket.get(name));
+                return {
+                    label: name.charAt(0).toUpperCase() + name.slice(1),
+                    data: totals.map(t => (t ? t.count : 0)),
+                    meanSeverity: totals.map(t => (t ? Math.round((t.severitySum / t.count) * 10) / 10 : null)),
+                    maxSeverity: totals.map(t => (t ? t.maxSeverity : null)),
+                    backgroundColor: this.getColorForSymptom(name)
+                };
+            })
         };
     }
 
@@ -116,10 +642,85 @@ window.Store = class Store {
         return colors[name] || 'rgba(201, 203, 207, 0.6)';
     }
 
-    exportData() {
+    // The export as string chunks of at most `chunkSize` records each. The
+    // text is exactly JSON.stringify(data, null, 2) (no indentation when
+    // compact) of the records between from and to. Records are read by
+    // cursor, so inserts made while a consumer waits between chunks neither
+    // repeat nor skip any.
+    *exportChunks({ compact = false, from, to, chunkSize = 500, source = null } = {}) {
+        const outer = compact ? '' : '\n  ';
+        const inner = compact ? '' : '\n    ';
+        const colon = compact ? ':' : ': ';
+        const json = (value, pad) => compact ? JSON.stringify(value) : JSON.stringify(value, null, 2).replace(/\n/g, pad);
+
+        yield '{';
+        for (const kind of ['meals', 'symptoms']) {
+            yield `${kind === 'meals' ? '' : ','}${outer}"${kind}"${colon}[`;
+
+            let cursor = null;
+            let empty = true;
+            do {
+                const query = source
+                    ? new window.RecordQuery(source[kind], { from: source.from, to: source.to, limit: chunkSize, cursor })
+                    : this.query({ type: kind, from, to, limit: chunkSize, cursor });
+                const page = query.page();
+                if (page.records.length === 0) break;
+                yield page.records.map((record, i) => `${empty && i === 0 ? '' : ','}${inner}${json(record, inner)}`).join('');
+                empty = false;
+                cursor = page.cursor;
+            } while (cursor);
+
+            yield empty ? ']' : `${outer}]`;
+        }
+        yield `,${outer}"settings"${colon}${json(this.data.settings, outer)}${compact ? '' : '\n'}}`;
+    }
+
+    // Pull-based byte stream of the export, e.g. for a file system writable
+    exportStream(options) {
+        const chunks = this.exportChunks(options);
+        const encoder = new TextEncoder();
+        return new ReadableStream({
+            pull(controller) {
+                const { value, done } = chunks.next();
+                if (done) controller.close();
+                else controller.enqueue(encoder.encode(value));
+            }
+        });
+    }
+
+    // Builds the export Blob a chunk at a time, yielding between chunks.
+    // Each chunk is folded into the Blob right away so its string can be
+    // collected, keeping peak memory at about one chunk.
+    async exportBlob(options = {}) {
+        const source = await this.exportSource(options);
+        let blob = new Blob([], { type: 'application/json' });
+        for (const chunk of this.exportChunks({ ...options, source })) {
+            blob = new Blob([blob, chunk], { type: 'application/json' });
+            await new Promise(resolve => setTimeout(resolve, 0));
+        }
+        return blob;
+    }
+
+    // A date-limited export from a store that has not hydrated yet reads
+    // just that range from the backend (for partitioned storage, just the
+    // months it overlaps); anything else hydrates first
+    async exportSource({ from, to }) {
+        if (this.hydrated || !this.backend.loadRange || (from === undefined && to === undefined)) {
+            await this.hydrate();
+            return null;
+        }
+        await this.flush();
+        const range = {
+            from: from === undefined ? -Infinity : new Date(from).getTime(),
+            to: to === undefined ? Infinity : new Date(to).getTime()
+        };
+        const records = await this.backend.loadRange(range.from, range.to);
+        return { ...range, meals: new window.TimeIndex(records.meals), symptoms: new window.TimeIndex(records.symptoms) };
+    }
+
+    async exportData(options = {}) {
         try {
-            const dataStr = JSON.stringify(this.data, null, 2);
-            const blob = new Blob([dataStr], { type: 'application/json' });
+            const blob = await this.exportBlob(options);
             const url = URL.createObjectURL(blob);
 
             const a = document.createElement('a');
@@ -144,70 +745,184 @@ window.Store = class Store {
     getCorrelations(symptomName) {
         if (!symptomName) return [];
 
-        const occurrences = this.data.symptoms.filter(s => s.symptom === symptomName);
-        if (occurrences.length === 0) return [];
+        const occurrences = this.symptomIndexes.get(symptomName);
+        if (!occurrences) return [];
 
-        const correlations = {}; // { triggerName: count }
+        return this.memoize(`correlations:${symptomName}`, () => {
+            if (!this.matrix) this.buildMatrix();
+            return window.CorrelationEngine.rank(this.matrix.get(symptomName) || new Map(), occurrences.length, this.triggerNames);
+        });
+    }
 
-        occurrences.forEach(symptom => {
-            const symptomTime = new Date(symptom.timestamp);
-            const triggersInWindow = new Set(); // Track unique triggers for THIS symptom occurrence
+    // Strongest symptom/trigger pairs across every symptom
+    getTopTriggers(limit = 10) {
+        return this.memoize(`topTriggers:${limit}`, () => this.computeTopTriggers(limit));
+    }
 
-            // Look for meals 2-24 hours prior
-            this.data.meals.forEach(meal => {
-                const mealTime = new Date(meal.timestamp);
-                const diffHours = (symptomTime - mealTime) / (1000 * 60 * 60);
+    computeTopTriggers(limit) {
+        if (!this.matrix) this.buildMatrix();
 
-                if (diffHours >= 1 && diffHours <= 12) {
-                    // Collect the meal name
-                    triggersInWindow.add(meal.name);
+        const rows = [];
+        this.matrix.forEach((row, symptom) => {
+            const occurrences = this.symptomIndexes.get(symptom).length;
+            row.forEach((count, trigger) => rows.push({
+                symptom,
+                name: this.triggerNames[trigger],
+                count,
+                percentage: Math.round((count / occurrences) * 100)
+            }));
+        });
+        return rows
+            .sort((a, b) => b.count - a.count || b.percentage - a.percentage)
+            .slice(0, limit);
+    }
 
-                    // Collect individual ingredients
-                    if (meal.ingredients) {
-                        const ingredients = meal.ingredients.split(',')
-                            .map(i => i.trim())
-                            .filter(i => i.length > 0);
+    // Compact input for CorrelationEngine: sorted epoch-ms arrays plus
+    // interned trigger ids, cheap to post to the analysis worker
+    getCorrelationSnapshot(symptomName) {
+        if (!symptomName) return null;
 
-                        ingredients.forEach(ingredient => {
-                            triggersInWindow.add(`Ingredient: ${ingredient}`);
-                        });
-                    }
-                }
-            });
+        const occurrences = this.symptomIndexes.get(symptomName);
+        if (!occurrences) return null;
 
-            // Increment the global count for each unique trigger found in this window
-            triggersInWindow.forEach(trigger => {
-                correlations[trigger] = (correlations[trigger] || 0) + 1;
-            });
+        const meals = this.indexes.meals;
+        return {
+            triggers: this.triggerNames,
+            mealTimes: Float64Array.from(meals.times),
+            mealTriggers: meals.records.map(m => this.mealTriggers.get(m)),
+            symptomTimes: Float64Array.from(occurrences.times)
+        };
+    }
+
+    // Input for a full symptom x trigger matrix build, tagged with the
+    // revision it was taken at
+    getMatrixSnapshot() {
+        const meals = this.indexes.meals;
+        const symptoms = this.indexes.symptoms;
+        return {
+            revision: this.revision,
+            triggers: this.triggerNames,
+            mealTimes: Float64Array.from(meals.times),
+            mealTriggers: meals.records.map(m => this.mealTriggers.get(m)),
+            symptomTimes: Float64Array.from(symptoms.times),
+            symptomKeys: symptoms.records.map(s => s.symptom)
+        };
+    }
+
+    buildMatrix() {
+        this.metrics.time('store.buildMatrix', () => {
+            const snapshot = this.getMatrixSnapshot();
+            this.installMatrix(window.CorrelationEngine.sweep(snapshot), snapshot.revision);
         });
+    }
 
-        // Convert to sorted array of correlations
-        return Object.entries(correlations)
-            .map(([name, count]) => ({
-                name,
-                count,
-                percentage: Math.round((count / occurrences.length) * 100)
-            }))
-            .sort((a, b) => b.count - a.count);
+    // Accepts a matrix built elsewhere (the worker) unless records were
+    // added since its snapshot was taken
+    installMatrix(matrix, revision) {
+        if (revision !== this.revision) return false;
+        this.matrix = matrix;
+        return true;
     }
 
-    importData(data) {
+    // Reads an export file incrementally (see ImportParser) and imports
+    // it. Rejects, without changing anything, when the file is not an export.
+    async importFile(file, options = {}) {
+        const parser = new window.ImportParser();
+        const incoming = { meals: [], symptoms: [] };
+        for await (const { text, done, total } of window.ImportParser.readText(file)) {
+            parser.push(text).forEach(({ kind, record }) => incoming[kind].push(record));
+            if (options.onProgress) options.onProgress({ phase: 'read', done, total });
+        }
+        const settings = parser.end();
+        return this.importRecords({ ...incoming, settings }, options);
+    }
+
+    async importData(data, options = {}) {
         try {
             if (!data.meals || !data.symptoms) {
                 throw new Error('Invalid data format: missing meals or symptoms arrays.');
             }
 
-            this.data = {
-                meals: data.meals,
-                symptoms: data.symptoms,
-                settings: data.settings || { theme: 'light' }
-            };
-
-            this.save();
+            await this.importRecords(data, options);
             return true;
         } catch (error) {
             console.error('Import failed:', error);
             return false;
         }
     }
-}
+
+    // Skips invalid records, then either replaces the current data or
+    // merges into it by id (imported records win). The indexes are rebuilt
+    // once and the records persisted `batchSize` at a time. Resolves with
+    // { added, updated, skipped } counts.
+    async importRecords(data, { mode = 'replace', batchSize = 500, onProgress } = {}) {
+        await this.hydrate();
+        // Queued records must not land after (and on top of) the import
+        await this.flush();
+
+        const summary = { added: 0, updated: 0, skipped: 0 };
+        const next = {};
+        const written = {};
+        ['meals', 'symptoms'].forEach(kind => {
+            const byId = new Map(mode === 'merge' ? this.data[kind].map(r => [r.id, r]) : []);
+            written[kind] = [];
+            data[kind].forEach(record => {
+                if (!window.ImportParser.isValid(kind, record)) {
+                    summary.skipped++;
+                    return;
+                }
+                if (byId.has(record.id)) summary.updated++;
+                else summary.added++;
+                byId.set(record.id, record);
+                written[kind].push(record);
+            });
+            next[kind] = [...byId.values()];
+        });
+        next.settings = mode === 'merge' ? this.data.settings : (data.settings || { theme: 'light' });
+
+        this.data = next;
+        this.buildIndexes();
+        this.emit({ kind: 'all' });
+
+        // On the write chain, so records added meanwhile are written after
+        // the import rather than between (or, replacing, before) its batches
+        this.writing = this.writing.catch(() => {}).then(async () => {
+            const time = Date.now();
+            this.lastWriteAt = time;
+            await this.metrics.time('store.import', () => this.saveBatches(written, mode === 'replace', batchSize, onProgress));
+            if (this.backend.saveRecent) await this.backend.saveRecent(this.recentPartition());
+            this.countPersisted();
+            if (mode === 'replace') this.broadcast({ type: 'reload', time });
+            else ['meals', 'symptoms'].forEach(kind => this.broadcastRecords(kind, written[kind], time));
+        });
+        await this.writing;
+        return summary;
+    }
+
+    async saveBatches(written, replace, batchSize, onProgress) {
+        if (!this.backend.recordWrites) {
+            await this.backend.save(this.data);
+            return;
+        }
+
+        if (replace) await this.backend.save({ meals: [], symptoms: [], settings: this.data.settings });
+        const total = written.meals.length + written.symptoms.length;
+        let done = 0;
+        for (const kind of ['meals', 'symptoms']) {
+            for (let i = 0; i < written[kind].length; i += batchSize) {
+                const records = written[kind].slice(i, i + batchSize);
+                await this.backend.save(this.data, { kind, records });
+                done += records.length;
+                if (onProgress) onProgress({ phase: 'write', done, total });
+            }
+        }
+    }
+};
+
+// Record messages above SYNC_LIMIT become a reload; received batches
+// above SYNC_EMIT_LIMIT re-render views once instead of per record.
+// RECENT_DAYS and RECENT_MIN_RECORDS size the recent partition.
+window.Store.SYNC_LIMIT = 1000;
+window.Store.SYNC_EMIT_LIMIT = 20;
+window.Store.RECENT_DAYS = 7;
+window.Store.RECENT_MIN_RECORDS = 5;
@@ -0,0 +1,47 @@
+// js/sync.js
+
+// Carries change messages between the app's open tabs and windows. Uses a
+// BroadcastChannel where there is one, otherwise storage events on a
+// scratch localStorage key. Either way a tab never receives its own
+// messages.
+
+window.TabSync = class TabSync {
+    constructor(name = 'vitaltrack') {
+        this.listeners = new Set();
+        if (typeof BroadcastChannel === 'function') {
+            this.channel = new BroadcastChannel(name);
+            this.channel.onmessage = (event) => this.deliver(event.data);
+        } else {
+            this.channel = null;
+            this.key = `${name}_sync`;
+            this.onStorage = (event) => {
+                if (event.key === this.key && event.newValue) this.deliver(JSON.parse(event.newValue).message);
+            };
+            window.addEventListener('storage', this.onStorage);
+        }
+    }
+
+    post(message) {
+        if (this.channel) {
+            this.channel.postMessage(message);
+        } else {
+            // The nonce makes a repeated message still count as a change
+            localStorage.setItem(this.key, JSON.stringify({ message, nonce: Math.random() }));
+        }
+    }
+
+    onMessage(listener) {
+        this.listeners.add(listener);
+        return () => this.listeners.delete(listener);
+    }
+
+    deliver(message) {
+        this.listeners.forEach(listener => listener(message));
+    }
+
+    close() {
+        if (this.channel) this.channel.close();
+        else window.removeEventListener('storage', this.onStorage);
+        this.listeners.clear();
+    }
+};
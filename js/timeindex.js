@@ -0,0 +1,103 @@
+// js/timeindex.js
+
+// Keeps records sorted by their timestamp (parsed once into epoch ms) with a
+// per-day bucket map, so "today", "latest N" and "last N days" queries are
+// binary searches or bucket lookups instead of full scans.
+// Records must be added through insert(); editing a record's timestamp in
+// place leaves the index stale.
+
+const pad2 = (n) => String(n).padStart(2, '0');
+
+window.TimeIndex = class TimeIndex {
+    constructor(records = []) {
+        const entries = records.map(record => ({ record, time: TimeIndex.timeOf(record) }));
+        entries.sort((a, b) => a.time - b.time);
+
+        this.records = entries.map(e => e.record);
+        this.times = entries.map(e => e.time);
+        this.days = new Map();
+        entries.forEach(({ record, time }) => this.bucketFor(time).push(record));
+    }
+
+    static timeOf(record) {
+        const time = Date.parse(record.timestamp);
+        return Number.isNaN(time) ? 0 : time;
+    }
+
+    // Local calendar day, e.g. "2026-01-31"
+    static dayKey(time) {
+        const d = new Date(time);
+        return `${d.getFullYear()}-${pad2(d.getMonth() + 1)}-${pad2(d.getDate())}`;
+    }
+
+    get length() {
+        return this.records.length;
+    }
+
+    bucketFor(time) {
+        const key = TimeIndex.dayKey(time);
+        let bucket = this.days.get(key);
+        if (!bucket) {
+            bucket = [];
+            this.days.set(key, bucket);
+        }
+        return bucket;
+    }
+
+    // First position whose time is >= `time`
+    lowerBound(time) {
+        let lo = 0;
+        let hi = this.times.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (this.times[mid] < time) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    // First position whose time is > `time`
+    upperBound(time) {
+        let lo = 0;
+        let hi = this.times.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (this.times[mid] <= time) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    insert(record) {
+        const time = TimeIndex.timeOf(record);
+        // Logging "now" is the common case and lands at the end
+        const pos = this.upperBound(time);
+        if (pos === this.records.length) {
+            this.records.push(record);
+            this.times.push(time);
+        } else {
+            this.records.splice(pos, 0, record);
+            this.times.splice(pos, 0, time);
+        }
+
+        const bucket = this.bucketFor(time);
+        let i = bucket.length;
+        while (i > 0 && TimeIndex.timeOf(bucket[i - 1]) > time) i--;
+        bucket.splice(i, 0, record);
+        return pos;
+    }
+
+    // Records with from <= time <= to, oldest first
+    range(from, to) {
+        return this.records.slice(this.lowerBound(from), this.upperBound(to));
+    }
+
+    // The newest `limit` records, oldest first
+    latest(limit) {
+        return this.records.slice(Math.max(0, this.records.length - limit));
+    }
+
+    onDay(key) {
+        return this.days.get(key) || [];
+    }
+};
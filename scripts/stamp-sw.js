@@ -0,0 +1,56 @@
+// scripts/stamp-sw.js
+
+// Writes a hash of the service worker's precached files into sw.js as
+// APP_VERSION, so changing any of them installs a new worker with a new
+// cache and the old one is deleted. Run after editing an asset:
+//   npm run stamp-sw
+// With --check it writes nothing and exits non-zero when the stamp is stale.
+
+import { createHash } from 'node:crypto';
+import { readFileSync, writeFileSync } from 'node:fs';
+import path from 'node:path';
+import { fileURLToPath } from 'node:url';
+
+const ROOT = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..');
+const SW = path.join(ROOT, 'sw.js');
+const VERSION = /^const APP_VERSION = '([^']*)';$/m;
+
+const readAsset = (asset) => readFileSync(path.join(ROOT, asset));
+
+export function readAssets(source) {
+    const list = source.match(/const ASSETS = \[([\s\S]*?)\];/);
+    if (!list) throw new Error('sw.js has no ASSETS list');
+    // './' is index.html again
+    return [...list[1].matchAll(/'([^']+)'/g)].map(match => match[1]).filter(asset => asset !== './');
+}
+
+export function currentVersion(source = readFileSync(SW, 'utf8')) {
+    const match = source.match(VERSION);
+    if (!match) throw new Error('sw.js has no APP_VERSION');
+    return match[1];
+}
+
+// Covers both the asset list and every file's bytes
+export function assetHash(source = readFileSync(SW, 'utf8'), read = readAsset) {
+    const hash = createHash('sha256');
+    readAssets(source).forEach(asset => {
+        hash.update(`${asset}\0`);
+        hash.update(read(asset));
+        hash.update('\0');
+    });
+    return hash.digest('hex').slice(0, 12);
+}
+
+if (process.argv[1] === fileURLToPath(import.meta.url)) {
+    const source = readFileSync(SW, 'utf8');
+    const version = assetHash(source);
+    if (process.argv.includes('--check')) {
+        if (currentVersion(source) !== version) {
+            console.error(`sw.js APP_VERSION is stale: run npm run stamp-sw (expected ${version})`);
+            process.exit(1);
+        }
+    } else {
+        writeFileSync(SW, source.replace(VERSION, `const APP_VERSION = '${version}';`));
+        console.log(`sw.js APP_VERSION = ${version}`);
+    }
+}
@@ -1,26 +1,167 @@
-const CACHE_NAME = 'vitaltrack-v1';
+// App shell and assets are served stale-while-revalidate from a versioned
+// cache: the cached copy answers at once and the network copy replaces it
+// for the next launch. Third-party files (such as the Chart.js CDN) are
+// cache-first within an entry and age budget. APP_VERSION is a hash of the
+// ASSETS files written by scripts/stamp-sw.js (npm run stamp-sw), and the
+// test suite fails while it is stale; older caches are deleted on activate.
+const APP_VERSION = '9aedb1f5464c';
+const RUNTIME_VERSION = 'v1';
+const APP_CACHE = `vitaltrack-app-${APP_VERSION}`;
+const RUNTIME_CACHE = `vitaltrack-runtime-${RUNTIME_VERSION}`;
+
 const ASSETS = [
     './',
     './index.html',
     './style.css',
     './js/app.js',
+    './js/columnar.js',
+    './js/storage.js',
+    './js/timeindex.js',
+    './js/query.js',
+    './js/correlation.js',
+    './js/memo.js',
+    './js/metrics.js',
+    './js/import.js',
+    './js/ingredients.js',
+    './js/rollups.js',
+    './js/ids.js',
+    './js/sync.js',
     './js/store.js',
+    './js/chart-loader.js',
+    './js/vendor/chart.umd.min.js',
+    './js/analyzer.js',
+    './js/correlation-worker.js',
     './js/components/forms.js',
+    './js/components/virtual-list.js',
+    './fonts/inter-latin-400.woff2',
+    './fonts/inter-latin-500.woff2',
+    './fonts/inter-latin-600.woff2',
+    './fonts/inter-latin-700.woff2',
     './manifest.json',
     './img/icon-192.png',
     './img/icon-512.png'
 ];
 
+// Opaque cross-origin responses do not expose their size, so the size
+// budget is an entry count
+const RUNTIME_BUDGET = {
+    maxEntries: 30,
+    maxAge: 30 * 24 * 60 * 60 * 1000
+};
+// Stored in the runtime cache: url -> time cached
+const RUNTIME_META = './__runtime-meta__';
+
+const APP_URLS = new Set(ASSETS.map(asset => new URL(asset, self.location).href));
+const SHELL = new URL('./index.html', self.location).href;
+
 self.addEventListener('install', event => {
     event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => cache.addAll(ASSETS))
+        caches.open(APP_CACHE).then(cache => {
+            // Bypass the HTTP cache so a new version never precaches stale files
+            const reload = (asset) => new Request(asset, { cache: 'reload' });
+            return cache.addAll(ASSETS.map(reload));
+        }).then(() => self.skipWaiting())
     );
 });
 
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const keep = [APP_CACHE, RUNTIME_CACHE];
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith('vitaltrack-') && !keep.includes(name))
+            .map(name => caches.delete(name)));
+
+        if (self.registration.navigationPreload) {
+            await self.registration.navigationPreload.enable();
+        }
+        await self.clients.claim();
+    })());
+});
+
 self.addEventListener('fetch', event => {
-    event.respondWith(
-        caches.match(event.request)
-            .then(response => response || fetch(event.request))
-    );
+    const { request } = event;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    // Query strings (such as ?debug) do not change which file is served
+    const path = url.origin + url.pathname;
+    if (url.origin !== self.location.origin) {
+        event.respondWith(cacheFirstWithBudget(event));
+    } else if (request.mode === 'navigate' && (path === SHELL || url.pathname === new URL('./', self.location).pathname)) {
+        event.respondWith(staleWhileRevalidate(event, SHELL));
+    } else if (APP_URLS.has(path)) {
+        event.respondWith(staleWhileRevalidate(event, path));
+    }
+    // Anything else (test pages, data files) goes straight to the network
 });
+
+async function staleWhileRevalidate(event, key) {
+    const cache = await caches.open(APP_CACHE);
+    const cached = await cache.match(key);
+
+    // A navigation's preloaded response saves waiting for the worker to start
+    const update = Promise.resolve(event.preloadResponse)
+        .then(preloaded => preloaded || fetch(event.request))
+        .then(async response => {
+            if (response.ok) await cache.put(key, response.clone());
+            return response;
+        });
+
+    if (cached) {
+        event.waitUntil(update.catch(() => {}));
+        return cached;
+    }
+    return update;
+}
+
+async function cacheFirstWithBudget(event) {
+    const { request } = event;
+    const cache = await caches.open(RUNTIME_CACHE);
+    const [cached, meta] = await Promise.all([cache.match(request), readMeta(cache)]);
+    if (cached && Date.now() - (meta[request.url] || 0) < RUNTIME_BUDGET.maxAge) {
+        return cached;
+    }
+
+    try {
+        const response = await fetch(request);
+        if (response.ok || response.type === 'opaque') {
+            event.waitUntil(putWithBudget(cache, request, response.clone()));
+        }
+        return response;
+    } catch (error) {
+        // Offline: an expired copy beats none
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+function readMeta(cache) {
+    return cache.match(RUNTIME_META)
+        .then(response => (response ? response.json() : {}))
+        .catch(() => ({}));
+}
+
+// Metadata updates are read-modify-write, so they run one at a time
+let metaQueue = Promise.resolve();
+
+function putWithBudget(cache, request, response) {
+    metaQueue = metaQueue.catch(() => {}).then(async () => {
+        await cache.put(request, response);
+        const meta = await readMeta(cache);
+        const now = Date.now();
+        meta[request.url] = now;
+
+        // Oldest first: drop expired entries, then any over the entry budget
+        const urls = Object.keys(meta).sort((a, b) => meta[a] - meta[b]);
+        let count = urls.length;
+        for (const url of urls) {
+            if (count <= RUNTIME_BUDGET.maxEntries && now - meta[url] <= RUNTIME_BUDGET.maxAge) break;
+            await cache.delete(url);
+            delete meta[url];
+            count--;
+        }
+        await cache.put(RUNTIME_META, new Response(JSON.stringify(meta)));
+    });
+    return metaQueue;
+}
@@ -40,8 +40,8 @@ def driver(base_url, request):
     # Navigate to the application
     driver.get(base_url)
     
-    # Clear localStorage before each test
-    driver.execute_script("localStorage.clear();")
+    # Clear localStorage and IndexedDB before each test
+    driver.execute_script("localStorage.clear(); indexedDB.deleteDatabase('vitaltrack');")
     driver.refresh()
     
     yield driver
@@ -68,7 +68,7 @@ def driver_visible(base_url, request):
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
     driver.get(base_url)
-    driver.execute_script("localStorage.clear();")
+    driver.execute_script("localStorage.clear(); indexedDB.deleteDatabase('vitaltrack');")
     driver.refresh()
     
     yield driver
@@ -86,8 +86,8 @@ def driver_visible(base_url, request):
 
 @pytest.fixture
 def clear_storage(driver):
-    """Clear localStorage and sessionStorage"""
-    driver.execute_script("localStorage.clear();")
+    """Clear localStorage, sessionStorage and IndexedDB"""
+    driver.execute_script("localStorage.clear(); indexedDB.deleteDatabase('vitaltrack');")
     driver.execute_script("sessionStorage.clear();")
     driver.refresh()
 
@@ -0,0 +1,19 @@
+import { readFileSync } from 'node:fs';
+import { assetHash, currentVersion, readAssets } from '../scripts/stamp-sw.js';
+
+const source = readFileSync(new URL('../sw.js', import.meta.url), 'utf8');
+
+describe('Service worker cache version', () => {
+    it('should match the hash of the precached assets (run npm run stamp-sw)', () => {
+        expect(currentVersion(source)).toBe(assetHash(source));
+    });
+
+    it('should change when any precached file changes', () => {
+        const assets = readAssets(source);
+        const read = (asset) => readFileSync(new URL(`../${asset}`, import.meta.url));
+        const edited = (asset) => (asset === './js/store.js' ? Buffer.concat([read(asset), Buffer.from('\n')]) : read(asset));
+
+        expect(assets).toContain('./js/store.js');
+        expect(assetHash(source, edited)).not.toBe(assetHash(source, read));
+    });
+});
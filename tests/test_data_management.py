@@ -111,7 +111,7 @@ class TestDataManagement:
             "Should show export functionality in data management view"
     
     def test_data_persistence(self, driver):
-        """Test that data persists in localStorage"""
+        """Test that data persists in IndexedDB"""
         wait = WebDriverWait(driver, 10)
         
         # Add a meal
@@ -131,14 +131,23 @@ class TestDataManagement:
         # Wait for modal to close
         wait.until(lambda d: "hidden" in d.find_element(By.ID, "modal-container").get_attribute("class"))
         
-        # Check localStorage
-        stored_data = driver.execute_script(
-            "return localStorage.getItem('vitaltrack_data');"
-        )
-        
-        assert stored_data is not None, "Data should be stored in localStorage"
-        assert "Persistence Test Meal" in stored_data, \
-            "Meal should be in localStorage"
+        # Check the meals object store (the write is asynchronous)
+        def stored_meals(d):
+            return d.execute_async_script("""
+                const done = arguments[arguments.length - 1];
+                const request = indexedDB.open('vitaltrack');
+                request.onsuccess = () => {
+                    const getAll = request.result.transaction('meals').objectStore('meals').getAll();
+                    getAll.onsuccess = () => done(JSON.stringify(getAll.result));
+                };
+            """)
+        
+        wait.until(lambda d: "Persistence Test Meal" in stored_meals(d))
+        
+        assert "Persistence Test Meal" in stored_meals(driver), \
+            "Meal should be in IndexedDB"
+        assert driver.execute_script("return localStorage.getItem('vitaltrack_data');") is None, \
+            "Meals should no longer be written to localStorage"
     
     def test_clear_storage_and_refresh(self, driver):
         """Test that clearing storage removes data"""
@@ -162,7 +171,7 @@ class TestDataManagement:
         wait.until(lambda d: "hidden" in d.find_element(By.ID, "modal-container").get_attribute("class"))
         
         # Clear storage
-        driver.execute_script("localStorage.clear();")
+        driver.execute_async_script("window.app.store.clear().then(arguments[arguments.length - 1]);")
         driver.refresh()
         
         # Wait for refresh
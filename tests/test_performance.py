@@ -0,0 +1,44 @@
+"""
+Test the performance instrumentation exposed as window.app.metrics
+"""
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+
+@pytest.mark.regression
+class TestPerformanceMetrics:
+    """Test suite for render and store timings"""
+
+    def test_view_renders_are_timed(self, driver, record_property):
+        """Each rendered view reports p50/p95 timings"""
+        wait = WebDriverWait(driver, 10)
+
+        for view in ["logs", "trends", "dashboard"]:
+            btn = wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, f'[data-view="{view}"]'))
+            )
+            btn.click()
+
+        wait.until(lambda d: d.execute_script(
+            "return 'render.trends' in window.app.metrics.summary().timings"
+        ))
+        summary = driver.execute_script("return window.app.metrics.summary()")
+        for name in ["render.logs", "render.trends", "render.dashboard"]:
+            timing = summary["timings"][name]
+            assert timing["count"] >= 1, f"{name} should be timed"
+            assert timing["p95"] >= timing["p50"] >= 0, f"{name} percentiles should be ordered"
+            # Reported in the JUnit XML (--junitxml) for tracking over time
+            record_property(f"{name}.p50_ms", timing["p50"])
+            record_property(f"{name}.p95_ms", timing["p95"])
+
+    def test_debug_panel_is_hidden_by_default(self, driver, base_url):
+        """The metrics panel only appears with ?debug"""
+        wait = WebDriverWait(driver, 10)
+        wait.until(EC.presence_of_element_located((By.ID, "view-title")))
+        assert not driver.find_elements(By.ID, "metrics-panel"), "Panel should be hidden by default"
+
+        driver.get(f"{base_url}?debug")
+        panel = wait.until(EC.presence_of_element_located((By.ID, "metrics-panel")))
+        assert "p95" in panel.text, "Panel should show p95 timings"
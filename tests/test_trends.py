@@ -9,6 +9,16 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 
 
+def set_meal_time(driver, hours_ago):
+    """Set the open meal form's time to some hours before now, in local time as the form expects"""
+    time_input = driver.find_element(By.ID, "meal-time")
+    driver.execute_script("""
+        const when = new Date(Date.now() - arguments[1] * 60 * 60 * 1000);
+        when.setMinutes(when.getMinutes() - when.getTimezoneOffset());
+        arguments[0].value = when.toISOString().slice(0, 16);
+    """, time_input, hours_ago)
+
+
 @pytest.mark.ui
 class TestTrends:
     """Test suite for trends and analysis functionality"""
@@ -85,23 +95,15 @@ class TestTrends:
         ingredients_input = driver.find_element(By.ID, "meal-ingredients")
         ingredients_input.send_keys("Chili, Beef, Onion")
         
+        # Eaten 5 hours ago, inside the analyzer's 1-12 hour window
+        set_meal_time(driver, hours_ago=5)
+        
         submit_btn = driver.find_element(By.CSS_SELECTOR, "#meal-form button[type='submit']")
         submit_btn.click()
         
         # Wait for modal to close
         wait.until(lambda d: "hidden" in d.find_element(By.ID, "modal-container").get_attribute("class"))
         
-        # Modify the meal timestamp to be 5 hours ago using JavaScript
-        driver.execute_script("""
-            const store = new Store();
-            const meals = store.data.meals;
-            if (meals.length > 0) {
-                const fiveHoursAgo = new Date(Date.now() - 5 * 60 * 60 * 1000);
-                meals[meals.length - 1].timestamp = fiveHoursAgo.toISOString();
-                store.save();
-            }
-        """)
-        
         # Log a symptom
         symptom_btn = wait.until(
             EC.element_to_be_clickable((By.ID, "quick-symptom-btn"))
@@ -143,12 +145,8 @@ class TestTrends:
         wait.until(lambda d: "analyzing" not in d.find_element(By.ID, "analyzer-results").text.lower())
         results_text = results.text.lower()
         
-        # Should show either the meal/ingredients OR a "no correlations" message
-        has_correlation = "spicy tacos" in results_text or "ingredient:" in results_text
-        has_no_correlation_msg = "no strong dietary correlations" in results_text or "no correlations" in results_text
-        
-        assert has_correlation or has_no_correlation_msg, \
-            "Should show either correlation results or no correlations message"
+        assert "spicy tacos" in results_text, "The meal eaten 5 hours before should be a trigger"
+        assert "ingredient: chili" in results_text, "Its ingredients should be triggers too"
     
     def test_ingredient_level_correlation(self, driver):
         """Test that ingredient-level correlations are shown"""
@@ -168,23 +166,14 @@ class TestTrends:
         ingredients_input = driver.find_element(By.ID, "meal-ingredients")
         ingredients_input.send_keys("Onion, Garlic, Lettuce")
         
+        set_meal_time(driver, hours_ago=3)
+        
         submit_btn = driver.find_element(By.CSS_SELECTOR, "#meal-form button[type='submit']")
         submit_btn.click()
         
         # Wait for modal to close
         wait.until(lambda d: "hidden" in d.find_element(By.ID, "modal-container").get_attribute("class"))
         
-        # Modify timestamp to 3 hours ago
-        driver.execute_script("""
-            const store = new Store();
-            const meals = store.data.meals;
-            if (meals.length > 0) {
-                const threeHoursAgo = new Date(Date.now() - 3 * 60 * 60 * 1000);
-                meals[meals.length - 1].timestamp = threeHoursAgo.toISOString();
-                store.save();
-            }
-        """)
-        
         # Log symptom
         symptom_btn = wait.until(
             EC.element_to_be_clickable((By.ID, "quick-symptom-btn"))
@@ -226,12 +215,9 @@ class TestTrends:
         wait.until(lambda d: "analyzing" not in d.find_element(By.ID, "analyzer-results").text.lower())
         results_text = results.text.lower()
         
-        # Should show either ingredient correlations OR a "no correlations" message
-        has_ingredient = "ingredient:" in results_text
-        has_no_correlation_msg = "no strong dietary correlations" in results_text or "no correlations" in results_text
-        
-        assert has_ingredient or has_no_correlation_msg, \
-            "Should show either ingredient-level correlations or no correlations message"
+        for ingredient in ["onion", "garlic", "lettuce"]:
+            assert f"ingredient: {ingredient}" in results_text, \
+                f"{ingredient} from the meal 3 hours before should be a trigger"
     
     def test_empty_state_analyzer(self, driver):
         """Test analyzer shows empty state when no symptom selected"""